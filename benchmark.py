@@ -0,0 +1,506 @@
+"""
+Headless benchmarks for the geometry and projection hot paths.
+
+Every case is timed across a range of scene sizes, measured in cubes. Results are written as JSON and can be compared
+against a stored baseline, for example:
+
+    python benchmark.py --output results.json
+    python benchmark.py --sizes 1 100 10000 --baseline benchmark_baseline.json
+
+The full frame cases draw to an off-screen Surface with the SDL dummy video driver, so no display is needed.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from cube import Cube, draw_cube
+from edge import Edge
+from impostor import ImpostorCache
+from instances import InstancedMesh
+from line import Line
+from loader import load_scene, read_binary, save_scene
+from mesh import CUBE_MESH
+from parallel import ParallelSimulation, Spin
+from pipeline import FramePipeline
+from point import Point
+from scene import Scene
+from vector import Vector
+
+SIZES = (1, 10, 100, 1000, 10000, 100000)
+SCREEN_WIDTH = 900
+SCREEN_HEIGHT = 600
+NOISE_FLOOR = 0.001  # seconds a case must slow down by, on top of the tolerance, to count as a regression
+
+
+def get_cube_layout(count: int, distance: float = 1.0):
+    """
+    Builds a reproducible layout of cubes spread out in front of a Camera at the origin.
+
+    :param count: the number of cubes
+    :param distance: how much farther away to spread the cubes than by default, keeping them in view
+    :return: a (count, 3) array of positions and a (count,) array of face lengths
+    """
+    rng = np.random.default_rng(0)
+    positions = np.column_stack([
+        rng.uniform(2000, 8000, count),
+        rng.uniform(-2000, 2000, count),
+        rng.uniform(-1500, 1500, count),
+    ]) * distance
+    return positions, rng.uniform(50, 500, count)
+
+
+def make_cubes(count: int, distance: float = 1.0):
+    """
+    Builds a reproducible set of Cubes spread out in front of a Camera at the origin.
+
+    :param count: the number of Cubes
+    :param distance: how much farther away to spread the Cubes than by default, keeping them in view
+    :return: a list of Cubes
+    """
+    positions, lengths = get_cube_layout(count, distance)
+    return [Cube(Point(*position), length) for position, length in zip(positions.tolist(), lengths.tolist())]
+
+
+def make_instances(count: int, dtype=np.float64):
+    """
+    Builds the same cubes as make_cubes, as instances of the cube Mesh.
+
+    :param count: the number of instances
+    :param dtype: the floating point type to store the instances in
+    :return: an InstancedMesh
+    """
+    instances = InstancedMesh(CUBE_MESH, dtype=dtype)
+    instances.extend(*get_cube_layout(count))
+    return instances
+
+
+def make_camera():
+    return Camera(Point(0, 0, 0), 1000)
+
+
+def bench_rotate(axis: str):
+    def setup(size):
+        cubes = make_cubes(size)
+
+        def run():
+            for cube in cubes:
+                getattr(cube, f"rotate_{axis}")(0.001)
+        return run
+    return setup
+
+
+def bench_get_screen_pos(size):
+    camera = make_camera()
+    points = [vertex for cube in make_cubes(size) for vertex in cube.vertices]
+    center_x = SCREEN_WIDTH / 2
+    center_y = SCREEN_HEIGHT / 2
+
+    def run():
+        for point in points:
+            camera.get_screen_pos(point, center_x, center_y)
+    return run
+
+
+def bench_project_points(size):
+    camera = make_camera()
+    scene = Scene()
+    for cube in make_cubes(size):
+        scene.add(cube)
+    world = scene.get_world_vertices()
+
+    def run():
+        camera.project_points(world, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    return run
+
+
+def bench_project_static(size):
+    camera = make_camera()
+    scene = Scene()
+    for cube in make_cubes(size):
+        scene.add(cube)
+    scene.project(camera, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+
+    def run():
+        scene.project(camera, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    return run
+
+
+def bench_plane_intersection(size):
+    camera = make_camera()
+    vertices = [vertex for cube in make_cubes(size) for vertex in cube.buffer.tolist()]
+    sight_lines = [Edge(camera.position, Point(*vertex)) for vertex in vertices]
+
+    def run():
+        for sight_line in sight_lines:
+            camera.viewport.get_intersection(sight_line)
+    return run
+
+
+def bench_has_point(kind: str):
+    def setup(size):
+        edges = []
+        midpoints = []
+        for cube in make_cubes(size):
+            for index0, index1 in cube.edge_indices.tolist():
+                point0 = Point(*cube.buffer[index0].tolist())
+                point1 = Point(*cube.buffer[index1].tolist())
+                edges.append(Edge(point0, point1))
+                midpoints.append(Point(*((cube.buffer[index0] + cube.buffer[index1]) / 2).tolist()))
+        if kind == "line":
+            has_point = Line.has_point
+        else:
+            has_point = Edge.has_point
+
+        def run():
+            for edge, midpoint in zip(edges, midpoints):
+                has_point(edge, midpoint)
+        return run
+    return setup
+
+
+def bench_has_points(size):
+    cubes = make_cubes(size)
+    edge = cubes[0].edges[0]
+    points = np.concatenate([cube.buffer for cube in cubes])
+
+    def run():
+        edge.has_points(points)
+    return run
+
+
+def bench_draw_cube_frame(size):
+    camera = make_camera()
+    cubes = make_cubes(size)
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def run():
+        screen.fill((0, 0, 0))
+        for cube in cubes:
+            cube.rotate_z(0.001)
+            draw_cube(cube, camera, screen)
+    return run
+
+
+def bench_scene_frame(solid: bool, impostors: bool = False, distance: float = 1.0):
+    def setup(size):
+        camera = make_camera()
+        cubes = make_cubes(size, distance)
+        scene = Scene()
+        for cube in cubes:
+            scene.add(cube)
+        scene.pack()
+        screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        cache = ImpostorCache() if impostors else None
+
+        def run():
+            screen.fill((0, 0, 0))
+            for cube in cubes:
+                cube.rotate_z(0.001)
+            scene.draw(camera, screen, solid=solid, impostors=cache)
+        return run
+    return setup
+
+
+def bench_pipelined_frame(size):
+    camera = make_camera()
+    cubes = make_cubes(size)
+    scene = Scene()
+    for cube in cubes:
+        scene.add(cube)
+    scene.pack()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pipeline = FramePipeline(scene, camera, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+    # the first frame has to be filled before anything is drawn, and the fastest run mustn't be one drawing nothing
+    pipeline.submit()
+    pipeline.swap()
+
+    def spin():
+        for cube in cubes:
+            cube.rotate_z(0.001)
+
+    def run():
+        # the next frame is spun and projected while the last one is drawn
+        pipeline.submit(spin)
+        screen.fill((0, 0, 0))
+        pipeline.draw(screen)
+        pipeline.swap()
+    run.close = pipeline.close
+    return run
+
+
+def bench_instance_transform(dtype):
+    def setup(size):
+        instances = make_instances(size, dtype)
+        axis = Vector(0, 0, 1)
+
+        def run():
+            instances.rotate(axis, 0.001)
+            instances.get_world_vertices()
+        return run
+    return setup
+
+
+def bench_instance_frame(dtype):
+    def setup(size):
+        camera = make_camera()
+        instances = make_instances(size, dtype)
+        screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        axis = Vector(0, 0, 1)
+
+        def run():
+            screen.fill((0, 0, 0))
+            instances.rotate(axis, 0.001)
+            instances.draw(camera, screen)
+        return run
+    return setup
+
+
+def bench_simulation(processes: int):
+    def setup(size):
+        scene = Scene()
+        for cube in make_cubes(size):
+            scene.add(cube)
+        spin = Spin(Vector(0, 0, 1), 0.5)
+        if processes == 0:
+            scene.pack()
+
+            def run():
+                scene.save_state()
+                spin(scene.get_models(), 1 / 120)
+                scene.get_world_vertices()
+            return run
+
+        simulation = ParallelSimulation(scene, spin, processes)
+
+        def run():
+            simulation.step(1, 1 / 120)
+            simulation.get_world_vertices()
+        run.close = simulation.close
+        return run
+    return setup
+
+
+def bench_load_scene(read_only: bool):
+    def setup(size):
+        scene = Scene()
+        for cube in make_cubes(size):
+            scene.add(cube)
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "cubes.scn")
+        save_scene(path, scene)
+
+        def run():
+            if read_only:
+                # only maps the file, the floor that building and packing the Scene is measured against
+                read_binary(path)
+            else:
+                load_scene(path).pack()
+        run.close = directory.cleanup
+        return run
+    return setup
+
+
+def bench_memory(kind: str):
+    def setup(size):
+        cubes = make_cubes(size)
+
+        def run():
+            if kind == "points":
+                return [Point(*vertex) for cube in cubes for vertex in cube.buffer.tolist()]
+            if kind == "buffer_points":
+                return [vertex for cube in cubes for vertex in cube.vertices]
+            return [edge for cube in cubes for edge in cube.edges]
+        # the bytes still held by the objects once they are built, on top of the time it takes to build them
+        tracemalloc.start()
+        objects = run()
+        run.nbytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        return run
+    return setup
+
+
+CASES = {
+    "cube.rotate_x": bench_rotate("x"),
+    "cube.rotate_y": bench_rotate("y"),
+    "cube.rotate_z": bench_rotate("z"),
+    "camera.get_screen_pos": bench_get_screen_pos,
+    "camera.project_points": bench_project_points,
+    "scene.project_static": bench_project_static,
+    "plane.get_intersection": bench_plane_intersection,
+    "line.has_point": bench_has_point("line"),
+    "edge.has_point": bench_has_point("edge"),
+    "edge.has_points": bench_has_points,
+    "frame.draw_cube": bench_draw_cube_frame,
+    "frame.scene": bench_scene_frame(False),
+    "frame.scene_solid": bench_scene_frame(True),
+    "frame.crowd": bench_scene_frame(False, distance=4.0),
+    "frame.crowd_impostors": bench_scene_frame(False, True, distance=4.0),
+    "frame.pipelined": bench_pipelined_frame,
+    "frame.instances.f64": bench_instance_frame(np.float64),
+    "frame.instances.f32": bench_instance_frame(np.float32),
+    "simulation.serial": bench_simulation(0),
+    "simulation.parallel": bench_simulation(os.cpu_count() or 1),
+    "instances.transform.f64": bench_instance_transform(np.float64),
+    "instances.transform.f32": bench_instance_transform(np.float32),
+    "loader.read_binary": bench_load_scene(True),
+    "loader.load_scene": bench_load_scene(False),
+    "memory.points": bench_memory("points"),
+    "memory.buffer_points": bench_memory("buffer_points"),
+    "memory.edges": bench_memory("edges"),
+}
+
+
+def time_case(run, min_time: float, max_repeats: int):
+    """
+    Times a benchmark case.
+
+    The case is run repeatedly until min_time has passed or it has run max_repeats times, and the fastest run is kept.
+    :param run: the callable to time
+    :param min_time: the least amount of time in seconds to spend repeating the case
+    :param max_repeats: the most times to run the case
+    :return: the fastest run in seconds and the number of runs
+    """
+    best = float("inf")
+    repeats = 0
+    started = perf_counter()
+    while repeats < max_repeats and (repeats == 0 or perf_counter() - started < min_time):
+        start = perf_counter()
+        run()
+        best = min(best, perf_counter() - start)
+        repeats += 1
+    return best, repeats
+
+
+def run_benchmarks(names, sizes, min_time: float, max_repeats: int, max_seconds: float):
+    """
+    Runs the named benchmark cases at every given size.
+
+    Once a single run of a case takes longer than max_seconds, the larger sizes of that case are skipped. A case whose
+    run function has a close method has it called once the case has been timed, and one whose run function has an
+    nbytes attribute has the memory it measured recorded as well.
+    :return: a list of result dicts
+    """
+    results = []
+    for name in names:
+        setup = CASES[name]
+        for size in sizes:
+            run = setup(size)
+            seconds, repeats = time_case(run, min_time, max_repeats)
+            # cases holding on to resources, like worker processes, release them once timed
+            if hasattr(run, "close"):
+                run.close()
+            results.append({
+                "name": name,
+                "size": size,
+                "seconds": seconds,
+                "per_cube_us": seconds / size * 1e6,
+                "repeats": repeats,
+            })
+            line = f"{name:24s} {size:>7d} cubes {seconds * 1000:12.3f} ms {seconds / size * 1e6:10.3f} us/cube"
+            if hasattr(run, "nbytes"):
+                results[-1]["bytes"] = run.nbytes
+                results[-1]["bytes_per_cube"] = run.nbytes / size
+                line += f" {run.nbytes / size:10.1f} B/cube"
+            print(line, file=sys.stderr)
+            if seconds > max_seconds:
+                break
+    return results
+
+
+def compare(results, baseline, tolerance: float, noise_floor: float = NOISE_FLOOR):
+    """
+    Compares results against a baseline.
+
+    A case only counts as a regression if it is both more than tolerance slower than the baseline and more than
+    noise_floor seconds slower, so the timer noise of cases that take a few microseconds isn't reported.
+    :param results: the current result dicts
+    :param baseline: the baseline result dicts
+    :param tolerance: how much slower than the baseline a case may be before it counts as a regression, as a fraction
+    :param noise_floor: how many seconds slower than the baseline a case may be before it counts as a regression
+    :return: a list of comparison dicts, a list of the regressed comparisons, and a list of the (name, size) of every
+        result that has nothing in the baseline to be compared against
+    """
+    previous = {(result["name"], result["size"]): result["seconds"] for result in baseline}
+    comparisons = []
+    missing = []
+    for result in results:
+        key = (result["name"], result["size"])
+        if key not in previous:
+            missing.append(key)
+            continue
+        ratio = result["seconds"] / previous[key]
+        regressed = ratio > 1 + tolerance and result["seconds"] - previous[key] > noise_floor
+        comparisons.append({"name": result["name"], "size": result["size"], "baseline_seconds": previous[key],
+                            "seconds": result["seconds"], "ratio": ratio, "regressed": regressed})
+    return comparisons, [comparison for comparison in comparisons if comparison["regressed"]], missing
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks the geometry and projection hot paths.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES), help="the cases to run")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="the scene sizes to run, in cubes")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend repeating each case")
+    parser.add_argument("--max-repeats", type=int, default=50, help="the most times to repeat each case")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="skip the larger sizes of a case once one run takes longer than this")
+    parser.add_argument("--output", metavar="PATH", help="write the results to a JSON file instead of stdout")
+    parser.add_argument("--baseline", metavar="PATH", help="compare the results against a stored JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="the fraction a case may be slower than the baseline before it counts as a regression")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR,
+                        help="the seconds a case must also be slower than the baseline by to count as a regression")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pygame.init()
+    results = run_benchmarks(args.cases, args.sizes, args.min_time, args.max_repeats, args.max_seconds)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        report["comparison"], regressions, missing = compare(results, baseline, args.tolerance, args.noise_floor)
+        report["missing"] = [{"name": name, "size": size} for name, size in missing]
+        for comparison in report["comparison"]:
+            flag = "REGRESSED" if comparison["regressed"] else ""
+            print(f"{comparison['name']:24s} {comparison['size']:>7d} cubes {comparison['ratio']:8.2f}x {flag}",
+                  file=sys.stderr)
+        # cases added since the baseline was recorded can't regress, so they are listed to show they weren't checked
+        for name, size in missing:
+            print(f"{name:24s} {size:>7d} cubes       no baseline", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    pygame.quit()
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,33 +1,201 @@
+import numpy as np
+
 from edge import Edge
 from plane import Plane
-from point import Point
-from vector import Vector
+from point import Point, ViewPoint
+from quaternion import Quaternion, from_axis_angle, from_matrix
+from vector import Vector, cross_product, dot_product
 
 
 class Camera:
-    def __init__(self, pos: Point, viewport_dist: float):
+    """
+    Represents a pinhole Camera that projects 3D points onto a flat viewport in front of it.
+
+    With no rotation the Camera faces towards positive x, with the screen's horizontal axis along positive y and its
+    vertical axis along positive z. Its orientation turns all three of these together, so it can look in any
+    direction.
+
+    Projecting a point is a multiply by a cached view-projection matrix followed by a perspective divide. The matrices
+    are only rebuilt when the Camera's position, orientation, viewport distance, or near plane, or the size of the
+    screen, changes. The position is handed out as a ViewPoint, so changing one of its components moves the Camera.
+    get_screen_pos keeps intersecting sight lines with the viewport Plane, as a reference for the matrix path.
+
+    Attributes:
+        position: Point
+            the Camera's position
+        orientation: Quaternion
+            the rotation turning the Camera from facing towards positive x
+        direction: Vector
+            a unit Vector pointing the way the Camera faces
+        right: Vector
+            a unit Vector pointing the way the screen's horizontal axis grows
+        down: Vector
+            a unit Vector pointing the way the screen's vertical axis grows
+        viewportDistance: float
+            the distance from the Camera to its viewport
+        viewport: Plane
+            the plane points are projected onto
+        view: numpy.ndarray
+            the 4x4 matrix that transforms world space into the Camera's space, where x is the depth in front of the
+            Camera and y and z are along its right and down axes
+        near: float
+            the distance from the Camera to its near plane
+        version: int
+            a counter bumped every time the Camera moves or turns, or its viewport distance or near plane changes
+    """
+
+    def __init__(self, pos: Point, viewport_dist: float, near: float = 1.0, orientation: Quaternion = None):
         """
         Instantiates a new Camera.
 
         :param pos: the Camera's position
         :param viewport_dist: the distance from the Cube to its viewing frame.
+        :param near: the distance from the Camera to its near plane; anything closer than this is not drawn
+        :param orientation: the rotation turning the Camera from facing towards positive x; no rotation by default
         """
-        self.position = pos
-
-        # right now the camera can only face towards positive x
-        direction = Vector(1, 0, 0)
-        self.direction = direction.get_unit_vector()
-
-        self.viewportDistance = viewport_dist
-        frame_x_pos = self.position.x + self.direction.x * self.viewportDistance
-        frame_y_pos = self.position.y + self.direction.y * self.viewportDistance
-        frame_z_pos = self.position.z + self.direction.z * self.viewportDistance
-        self.viewport = Plane(Point(frame_x_pos, frame_y_pos, frame_z_pos), self.direction)
+        self._near = near
+        self._viewport_distance = viewport_dist
+        self._position = np.array([pos.x, pos.y, pos.z], dtype=np.float64)
+        self._screen_center = None
+        self._view_projection = None
+        self._frustum_planes = None
+        self.version = 0
+        self.orientation = orientation if orientation is not None else Quaternion()
 
     def __repr__(self):
         return f"Camera(position:{self.position}, direction:{self.direction}, " \
                f"viewportDistance:{self.viewportDistance}, viewport:{self.viewport})"
 
+    @property
+    def position(self):
+        """The Camera's position, as a ViewPoint that moves the Camera when it is changed."""
+        return ViewPoint(self._position, self._update_viewport)
+
+    @position.setter
+    def position(self, position: Point):
+        self._position[:] = (position.x, position.y, position.z)
+        self._update_viewport()
+
+    @property
+    def near(self):
+        """The distance from the Camera to its near plane."""
+        return self._near
+
+    @near.setter
+    def near(self, near: float):
+        self._near = near
+        # the near plane is one of the cached frustum planes, which are rebuilt along with the projection
+        self._view_projection = None
+        self.version += 1
+
+    @property
+    def viewportDistance(self):
+        """The distance from the Camera to its viewport."""
+        return self._viewport_distance
+
+    @viewportDistance.setter
+    def viewportDistance(self, viewport_dist: float):
+        self._viewport_distance = viewport_dist
+        self._update_viewport()
+
+    @property
+    def orientation(self):
+        """The rotation turning the Camera from facing towards positive x."""
+        return self._orientation
+
+    @orientation.setter
+    def orientation(self, orientation: Quaternion):
+        self._orientation = orientation
+        self.direction = orientation.rotate(Vector(1, 0, 0))
+        self.right = orientation.rotate(Vector(0, 1, 0))
+        self.down = orientation.rotate(Vector(0, 0, 1))
+        self._update_viewport()
+
+    def _update_viewport(self):
+        """Moves the viewport in front of the Camera, rebuilds the view matrix, and drops the cached projection."""
+        position_x, position_y, position_z = self._position.tolist()
+        frame_x_pos = position_x + self.direction.x * self.viewportDistance
+        frame_y_pos = position_y + self.direction.y * self.viewportDistance
+        frame_z_pos = position_z + self.direction.z * self.viewportDistance
+        self.viewport = Plane(Point(frame_x_pos, frame_y_pos, frame_z_pos), self.direction)
+
+        self.view = np.identity(4)
+        self.view[:3, :3] = [
+            [self.direction.x, self.direction.y, self.direction.z],
+            [self.right.x, self.right.y, self.right.z],
+            [self.down.x, self.down.y, self.down.z],
+        ]
+        self.view[:3, 3] = -self.view[:3, :3] @ self._position
+        self._view_projection = None
+        self.version += 1
+
+    def get_projection(self, center_x: float, center_y: float):
+        """
+        Builds the matrix that projects points in the Camera's space onto a screen.
+
+        A point at depth d that is u to the right and v below the Camera becomes (center_x * d + f * u,
+        center_y * d + f * v, d), where f is the viewport distance, so dividing by the last component gives its screen
+        position.
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: a 3x4 projection matrix
+        """
+        distance = self.viewportDistance
+        return np.array([
+            [center_x, distance, 0.0, 0.0],
+            [center_y, 0.0, distance, 0.0],
+            [1.0, 0.0, 0.0, 0.0],
+        ])
+
+    def get_view_projection(self, center_x: float, center_y: float):
+        """
+        Looks up the matrix that projects world space points onto a screen, rebuilding it only if something changed.
+
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: a 3x4 matrix mapping a world space point (x, y, z, 1) to (screen x * depth, screen y * depth, depth)
+        """
+        if self._view_projection is None or self._screen_center != (center_x, center_y):
+            self._screen_center = (center_x, center_y)
+            self._view_projection = self.get_projection(center_x, center_y) @ self.view
+            self._frustum_planes = None
+        return self._view_projection
+
+    def rotate(self, axis: Vector, rotation: float):
+        """
+        Turns the Camera about an axis through its position.
+
+        :param axis: the direction of the axis in world space, of any non-zero length
+        :param rotation: the rotation in radians, following the right-hand rule
+        """
+        self.orientation = (from_axis_angle(axis, rotation) * self.orientation).get_unit_quaternion()
+
+    def look_at(self, target: Point, up: Vector = Vector(0, 0, -1)):
+        """
+        Turns the Camera to face a Point.
+
+        :param target: the Point to face
+        :param up: the world space direction that should appear upwards on the screen, as far as possible
+        :raises ValueError: if the target is at the Camera's position, or up is zero or along the way to the target,
+            since then there is no one way to face it
+        """
+        forward = Vector(target.x - self.position.x, target.y - self.position.y, target.z - self.position.z)
+        if forward.get_magnitude() == 0:
+            raise ValueError(f"can't look at {target} from the same position")
+        forward = forward.get_unit_vector()
+        right = cross_product(forward, up)
+        if right.get_magnitude() <= 1e-9 * up.get_magnitude():
+            raise ValueError(f"up must be a direction other than the one towards {target}, not {up}")
+        right = right.get_unit_vector()
+        down = cross_product(forward, right)
+        # the columns of the rotation are where the x, y, and z axes end up
+        matrix = np.array([
+            [forward.x, right.x, down.x],
+            [forward.y, right.y, down.y],
+            [forward.z, right.z, down.z],
+        ])
+        self.orientation = from_matrix(matrix)
+
     def get_screen_pos(self, point: Point, center_x: float, center_y: float):
         """
         Calculates the 2D position on a screen of a given 3D point.
@@ -35,13 +203,134 @@ class Camera:
         :param point: the given point
         :param center_x: the horizontal center of the screen
         :param center_y: the vertical center of the screen
+        :return: the screen position, or None if the point is not in front of the Camera's near plane
         """
-        sight_line = Edge(self.position, point)
+        position = Point(*self._position.tolist())
+        depth = (point.x - position.x) * self.direction.x + (point.y - position.y) * self.direction.y + \
+            (point.z - position.z) * self.direction.z
+        if depth < self.near:
+            return None
+        sight_line = Edge(position, point)
         intersect = self.viewport.get_intersection(sight_line)
         if intersect is not None:
-            return center_x + intersect.y, center_y + intersect.z
+            offset = intersect - self.viewport.point
+            return center_x + dot_product(offset, self.right), center_y + dot_product(offset, self.down)
         else:
             return None
 
+    def project_points(self, points: np.ndarray, center_x: float, center_y: float):
+        """
+        Calculates the 2D positions on a screen of many 3D points at once.
+
+        This is the vectorized form of get_screen_pos. Every point is multiplied by the cached view-projection matrix
+        and divided by its depth, in a single pass over the array.
+        :param points: an (N, 3) array of points
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: an (N, 2) array of screen positions and an (N,) boolean mask that is False wherever get_screen_pos
+            would have returned None
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        view_projection = self.get_view_projection(center_x, center_y)
+        projected = points @ view_projection[:, :3].T
+        projected += view_projection[:, 3]
+
+        depths = projected[:, 2]
+        visible = depths >= self.near
+        screen = projected[:, :2]
+        # points that aren't visible are divided by 1 instead of a depth that may be 0
+        screen /= np.where(visible, depths, 1.0)[:, None]
+        return screen, visible
+
+    def get_depths(self, points: np.ndarray):
+        """
+        Calculates how far in front of the Camera many 3D points are, measured along the direction it faces.
+
+        :param points: an (N, 3) array of points
+        :return: an (N,) array of distances, negative for points behind the Camera
+        """
+        return np.asarray(points, dtype=np.float64).reshape(-1, 3) @ self.view[0, :3] + self.view[0, 3]
+
+    def clip_to_near(self, points0: np.ndarray, points1: np.ndarray):
+        """
+        Clips edges that cross the Camera's near plane so that both of their ends are in front of it.
+
+        Whichever end of an edge is behind the near plane is moved along the edge to where it crosses the near plane.
+        Edges that are entirely in front of the near plane are returned unchanged, and edges that are entirely behind it
+        are marked as not kept.
+        :param points0: an (E, 3) array of the first end of each edge
+        :param points1: an (E, 3) array of the second end of each edge
+        :return: the (E, 3) arrays of clipped first and second ends, and an (E,) boolean mask of the edges that are
+            at least partly in front of the near plane
+        """
+        points0 = np.array(points0, dtype=np.float64).reshape(-1, 3)
+        points1 = np.array(points1, dtype=np.float64).reshape(-1, 3)
+        depths0 = self.get_depths(points0)
+        depths1 = self.get_depths(points1)
+        kept = (depths0 >= self.near) | (depths1 >= self.near)
+        crossing = kept & ((depths0 < self.near) | (depths1 < self.near))
 
+        difference = depths1[crossing] - depths0[crossing]
+        t = ((self.near - depths0[crossing]) / difference)[:, None]
+        crossings = points0[crossing] + (points1[crossing] - points0[crossing]) * t
+        behind0 = np.zeros_like(kept)
+        behind0[crossing] = depths0[crossing] < self.near
+        behind1 = crossing & ~behind0
+        points0[behind0] = crossings[behind0[crossing]]
+        points1[behind1] = crossings[behind1[crossing]]
+        return points0, points1, kept
 
+    def get_frustum_planes(self, center_x: float, center_y: float):
+        """
+        Calculates the planes that bound everything the Camera can see on a screen.
+
+        There are five planes: the near plane, and one plane through the Camera's position and each side of the part of
+        the viewport that ends up on the screen. They are read straight off the rows of the view-projection matrix, and
+        cached along with it. Their normals point into the visible space.
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: a (5, 4) array of planes as (a, b, c, d), where a point p is on the visible side if a*x + b*y + c*z + d
+            is positive
+        """
+        view_projection = self.get_view_projection(center_x, center_y)
+        if self._frustum_planes is None:
+            screen_x, screen_y, depth = view_projection
+            planes = np.array([
+                depth - (0.0, 0.0, 0.0, self.near),
+                screen_x,
+                center_x * 2 * depth - screen_x,
+                screen_y,
+                center_y * 2 * depth - screen_y,
+            ])
+            planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+            planes.flags.writeable = False
+            self._frustum_planes = planes
+        return self._frustum_planes
+
+    def spheres_in_frustum(self, centers: np.ndarray, radii: np.ndarray, center_x: float, center_y: float):
+        """
+        Determines which of many bounding spheres are at least partly inside what the Camera can see.
+
+        :param centers: an (M, 3) array of sphere centers
+        :param radii: an (M,) array of sphere radii
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: an (M,) boolean mask that is True for the spheres that may be visible
+        """
+        planes = self.get_frustum_planes(center_x, center_y)
+        distances = np.asarray(centers).reshape(-1, 3) @ planes[:, :3].T + planes[:, 3]
+        return (distances > -np.asarray(radii)[:, None]).all(axis=1)
+
+    def get_ray(self, screen_x: float, screen_y: float, center_x: float, center_y: float):
+        """
+        Calculates the sight line through a position on the screen, such as the mouse cursor.
+
+        This is the inverse of get_screen_pos: every point on the returned ray is drawn at the given screen position.
+        :param screen_x: the horizontal screen position
+        :param screen_y: the vertical screen position
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: a copy of the Camera's position and a unit Vector pointing along the ray
+        """
+        direction = self.view[:3, :3].T @ (self.viewportDistance, screen_x - center_x, screen_y - center_y)
+        return Point(*self._position.tolist()), Vector(*direction.tolist()).get_unit_vector()
@@ -0,0 +1,93 @@
+import numpy as np
+import pygame
+
+
+class DirtyRects:
+    """
+    Tracks the parts of a screen that changed between frames, so only those parts are cleared and pushed to the display.
+
+    Every frame, the rectangles drawn in the previous frame are cleared to the background, the new frame is drawn, and
+    the rectangles drawn in both frames are passed to pygame.display.update. Once there are too many rectangles for
+    that to pay off, the whole screen is cleared and updated instead.
+
+    Attributes:
+        screen: pygame.Surface
+            the display Surface
+        background: tuple
+            the color the screen is cleared to
+        max_rects: int
+            the most rectangles to track before falling back to clearing and updating the whole screen
+        padding: int
+            the number of pixels to grow every rectangle by, to cover antialiased edges
+    """
+
+    def __init__(self, screen: pygame.Surface, background=(0, 0, 0), max_rects: int = 256, padding: int = 2):
+        """
+        Instantiates a new DirtyRects.
+
+        :param screen: the display Surface
+        :param background: the color the screen is cleared to
+        :param max_rects: the most rectangles to track before falling back to the whole screen
+        :param padding: the number of pixels to grow every rectangle by
+        """
+        self.screen = screen
+        self.background = background
+        self.max_rects = max_rects
+        self.padding = padding
+        self._previous = None
+        self._current = []
+
+    def __repr__(self):
+        return f"DirtyRects(max_rects:{self.max_rects}, padding:{self.padding})"
+
+    def clear(self):
+        """Clears everything that was drawn in the previous frame to the background color."""
+        if self._previous is None:
+            self.screen.fill(self.background)
+        else:
+            for rect in self._previous:
+                self.screen.fill(self.background, rect)
+
+    def add(self, rect):
+        """
+        Marks a rectangle as drawn in the current frame.
+
+        :param rect: a pygame.Rect, or None for nothing
+        """
+        if rect is None:
+            return
+        rect = pygame.Rect(rect).inflate(self.padding * 2, self.padding * 2).clip(self.screen.get_rect())
+        if rect.width > 0 and rect.height > 0:
+            self._current.append(rect)
+
+    def add_bounds(self, bounds: np.ndarray):
+        """
+        Marks many boxes as drawn in the current frame.
+
+        :param bounds: an (M, 4) array of (left, top, right, bottom) boxes, like the one from Scene.get_screen_bounds
+        """
+        width, height = self.screen.get_size()
+        on_screen = np.isfinite(bounds).all(axis=1) & (bounds[:, 2] >= 0) & (bounds[:, 3] >= 0) & \
+            (bounds[:, 0] < width) & (bounds[:, 1] < height)
+        boxes = bounds[on_screen]
+        if len(self._current) + len(boxes) > self.max_rects:
+            # a whole-screen rectangle makes every later rectangle redundant
+            self._current = [self.screen.get_rect()]
+            return
+        left = np.floor(boxes[:, 0]).astype(int)
+        top = np.floor(boxes[:, 1]).astype(int)
+        right = np.ceil(boxes[:, 2]).astype(int)
+        bottom = np.ceil(boxes[:, 3]).astype(int)
+        for x0, y0, x1, y1 in zip(left.tolist(), top.tolist(), right.tolist(), bottom.tolist()):
+            self.add(pygame.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1))
+
+    def update(self):
+        """Pushes the rectangles drawn in this frame and the previous frame to the display."""
+        if self._previous is None or len(self._previous) + len(self._current) > self.max_rects:
+            pygame.display.update()
+        else:
+            pygame.display.update(self._previous + self._current)
+        if len(self._current) > self.max_rects:
+            self._current = [self.screen.get_rect()]
+        self._previous = self._current
+        self._current = []
@@ -1,3 +1,5 @@
+import numpy as np
+
 from line import Line
 from point import Point
 from vector import Vector
@@ -10,6 +12,9 @@ class Edge(Line):
     Edge inherits from Line, and is mostly the same. The key difference between an Edge and a Line is that an Edge
     is finite. Lines go on forever, but an Edge is limited between its two given points.
 
+    An Edge's point and direction are computed from its two ends whenever they are read, so they stay correct when
+    the ends move.
+
     Attributes:
         point0: Point
             a point at an end of the Edge
@@ -17,6 +22,8 @@ class Edge(Line):
             a point at an end of the Edge
     """
 
+    __slots__ = ('point0', 'point1')
+
     def __init__(self, point0: Point, point1: Point):
         """
         Instantiates a new Edge.
@@ -26,11 +33,20 @@ class Edge(Line):
         """
         self.point0 = point0
         self.point1 = point1
-        super().__init__(point0, Vector(point1.x - point0.x, point1.y - point0.y, point1.z - point0.z))
 
     def __repr__(self):
         return f"Edge({self.point0},{self.point1})"
 
+    @property
+    def point(self):
+        """The Point the Edge's Line passes through, which is the Edge's first end."""
+        return self.point0
+
+    @property
+    def direction(self):
+        """The Vector from the Edge's first end to its second end."""
+        return Vector(self.point1.x - self.point0.x, self.point1.y - self.point0.y, self.point1.z - self.point0.z)
+
     def has_point(self, point: Point):
         """
         Determines if some given Point exists on the Edge.
@@ -71,3 +87,26 @@ class Edge(Line):
 
         return super().has_point(point) and min_x <= point.x <= max_x and min_y <= point.y <= max_y and \
             min_z <= point.z <= max_z
+
+    def has_points(self, points: np.ndarray, epsilon: float = 1e-6):
+        """
+        Determines which of many given points exist on the Edge, allowing for floating point error.
+
+        Each point is projected onto the Edge's Line, and the projection is clamped between the Edge's two ends to
+        find the closest point on the Edge. A point is on the Edge if its distance from that closest point is at most
+        epsilon. This replaces the separate Line and bounds checks of has_point with one formula.
+        :param points: an (N, 3) array of points
+        :param epsilon: the largest distance from the Edge that still counts as on it
+        :return: an (N,) boolean array that is True for the points on the Edge
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        start = np.array([self.point0.x, self.point0.y, self.point0.z])
+        end = np.array([self.point1.x, self.point1.y, self.point1.z])
+        direction = end - start
+        length_squared = np.dot(direction, direction)
+        offsets = points - start
+        if length_squared == 0:
+            # an Edge whose ends are the same point is just that point
+            return np.linalg.norm(offsets, axis=1) <= epsilon
+        t = np.clip(offsets @ direction / length_squared, 0.0, 1.0)
+        return np.linalg.norm(offsets - t[:, None] * direction, axis=1) <= epsilon
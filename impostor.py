@@ -0,0 +1,153 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from scene import Scene
+
+IMPOSTOR_CACHE_SIZE = 4096  # the most sprites an ImpostorCache keeps
+ORIENTATION_STEPS = 16  # the number of steps each axis of an orientation is rounded to, per unit
+MAX_SPRITE_RADIUS = 16  # the largest an object may look on screen, in pixels from its center, to be drawn as a sprite
+
+
+class ImpostorCache:
+    """
+    Draws distant objects that share a Mesh as pre-rendered wireframe sprites, one blit per object.
+
+    Far from the Camera, perspective barely changes an object's shape across its own depth, so the object looks the
+    same wherever it is on the screen and only its orientation relative to the Camera and its size on screen matter.
+    Both are rounded, the orientation to steps of 1 / orientation_steps along each of the screen's axes and the size
+    to whole pixels, so objects that look nearly the same share one sprite. Each sprite is drawn once onto a small
+    off-screen Surface and kept in a cache that evicts the least recently used sprite once more than max_size are
+    kept. Every distant object is then drawn with a single blit, which is far cheaper than drawing each of its edges.
+
+    Only objects that share their Mesh's vertices, that are entirely in front of the Camera's near plane, and that
+    look no larger than max_radius pixels from their center become sprites; everything else is left for
+    Scene.draw_projected to draw exactly. Sprites have black as their transparent color, so they are meant for a
+    black background.
+
+    Attributes:
+        max_size: int
+            the most sprites to keep
+        orientation_steps: int
+            the number of steps each axis of an orientation is rounded to, per unit
+        max_radius: float
+            the largest an object may look on screen, in pixels from its center, to be drawn as a sprite
+    """
+
+    def __init__(self, max_size: int = IMPOSTOR_CACHE_SIZE, orientation_steps: int = ORIENTATION_STEPS,
+                 max_radius: float = MAX_SPRITE_RADIUS):
+        """
+        Instantiates a new, empty ImpostorCache.
+
+        :param max_size: the most sprites to keep
+        :param orientation_steps: the number of steps each axis of an orientation is rounded to, per unit; more steps
+            make sprites more accurate, but fewer objects share them
+        :param max_radius: the largest an object may look on screen, in pixels from its center, to be drawn as a
+            sprite
+        """
+        self.max_size = max_size
+        self.orientation_steps = orientation_steps
+        self.max_radius = max_radius
+        self._sprites = OrderedDict()
+
+    def __repr__(self):
+        return f"ImpostorCache(max_size:{self.max_size}, sprites:{len(self._sprites)})"
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def clear(self):
+        """Forgets every sprite."""
+        self._sprites.clear()
+
+    def draw(self, scene: Scene, camera: Camera, screen: pygame.Surface, screen_points: np.ndarray,
+             visible: np.ndarray, alpha: float = None, color=(255, 255, 255)):
+        """
+        Draws the distant objects of a Scene as sprites.
+
+        :param scene: the Scene
+        :param camera: the Camera the Scene was projected with
+        :param screen: the Surface
+        :param screen_points: the (N, 2) array of screen positions returned by Scene.project
+        :param visible: the (N,) boolean visibility mask returned by Scene.project
+        :param alpha: the alpha the Scene was projected with, see Scene.get_models
+        :param color: the color of the edges
+        :return: an (M,) boolean mask of the objects that were drawn, in the order the Scene packs them; the rest can be
+            drawn with Scene.draw_projected(..., object_mask=~drawn)
+        """
+        models = scene.get_models(alpha)
+        drawn = np.zeros(len(models), dtype=bool)
+        center_x = screen.get_width() / 2
+        center_y = screen.get_height() / 2
+        # every rounded orientation and radius is packed into a single integer, so one sort finds the shared sprites
+        key_shape = (2 * self.orientation_steps + 1,) * 6 + (int(self.max_radius) + 1,)
+        sprites = []
+        sprite_indices = []
+        selected = []
+        for start, end, vertex_start, vertex_count, local in scene.get_groups(0, len(models)):
+            if local.ndim != 2 or vertex_count == 0:
+                # objects with their own vertices don't look like anything else
+                continue
+            group_models = models[start:end]
+            group_visible = visible[vertex_start:vertex_start + (end - start) * vertex_count]
+            in_front = group_visible.reshape(end - start, vertex_count).all(axis=1)
+
+            # the part of each object's transform that moves its vertices across the screen, in pixels
+            depths = camera.get_depths(group_models[:, :3, 3])
+            pixels = np.einsum("ij,mjk->mik", camera.view[1:3, :3], group_models[:, :3, :3])
+            pixels *= (camera.viewportDistance / np.maximum(depths, camera.near))[:, None, None]
+            scales = np.linalg.norm(pixels, axis=2).max(axis=1)
+            radii = np.rint(scales * np.linalg.norm(local, axis=1).max()).astype(np.int64)
+            small = in_front & (radii > 0) & (radii <= self.max_radius)
+            if not small.any():
+                continue
+
+            indices = np.flatnonzero(small)
+            axes = np.rint(pixels[indices] / scales[indices, None, None] * self.orientation_steps).astype(np.int64)
+            axes = axes.reshape(-1, 6) + self.orientation_steps
+            codes = np.ravel_multi_index((*axes.T, radii[indices]), key_shape)
+            unique_codes, inverse = np.unique(codes, return_inverse=True)
+            obj = scene.packed_objects[start]
+            sprite_indices.append(inverse.reshape(-1) + len(sprites))
+            sprites.extend(self._get_sprite(obj.local, obj.edge_indices, code, key_shape, color)
+                           for code in unique_codes.tolist())
+            selected.append(indices + start)
+        if not selected:
+            return drawn
+
+        selected = np.concatenate(selected)
+        origins, _ = camera.project_points(models[selected, :3, 3], center_x, center_y)
+        origins = np.rint(origins).astype(int).tolist()
+        screen.blits([(sprites[sprite][0], (origin[0] - sprites[sprite][1], origin[1] - sprites[sprite][2]))
+                      for sprite, origin in zip(np.concatenate(sprite_indices).tolist(), origins)], doreturn=False)
+        drawn[selected] = True
+        return drawn
+
+    def _get_sprite(self, local: np.ndarray, edges: np.ndarray, code: int, key_shape: tuple, color):
+        """Looks up the sprite for a key made by draw, or draws and keeps it if it isn't cached."""
+        cache_key = (id(local), code, key_shape, tuple(color))
+        sprite = self._sprites.get(cache_key)
+        if sprite is not None and sprite[3] is local:
+            self._sprites.move_to_end(cache_key)
+            return sprite
+
+        # undo the rounding done in draw, from steps back to screen axes and from the radius back to a scale
+        *axes, radius = np.unravel_index(code, key_shape)
+        axes = (np.array(axes, dtype=np.float64).reshape(2, 3) - self.orientation_steps) / self.orientation_steps
+        points = local @ axes.T * (radius / np.linalg.norm(local, axis=1).max())
+        low = np.floor(points.min(axis=0)).astype(int) - 1
+        high = np.ceil(points.max(axis=0)).astype(int) + 1
+        surface = pygame.Surface((high[0] - low[0] + 1, high[1] - low[1] + 1))
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        points = (points - low).tolist()
+        for index0, index1 in edges.tolist():
+            pygame.draw.aaline(surface, color, points[index0], points[index1])
+
+        # the sprite holds on to the vertices it was drawn from, so their id can't be reused by another Mesh
+        sprite = (surface, -int(low[0]), -int(low[1]), local)
+        self._sprites[cache_key] = sprite
+        while len(self._sprites) > self.max_size:
+            self._sprites.popitem(last=False)
+        return sprite
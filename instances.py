@@ -0,0 +1,268 @@
+import numpy as np
+import pygame
+
+from camera import Camera
+from mesh import Mesh
+from mesh_object import NORMALIZE_INTERVAL
+from point import Point
+from quaternion import Quaternion, get_rotation
+from scene import draw_strips, get_strip_order
+from vector import Vector
+
+INSTANCE_CHUNK_SIZE = 16384  # the most instances transformed and projected at once while drawing
+
+
+def get_instance_dtype(dtype=np.float64):
+    """
+    Builds the structured type of one instance of an InstancedMesh.
+
+    :param dtype: the floating point type every field is stored in
+    :return: a structured dtype with a 3 item position, a scale, and a 4 item (w, x, y, z) orientation Quaternion
+    """
+    return np.dtype([("position", dtype, 3), ("scale", dtype), ("orientation", dtype, 4)])
+
+
+def get_rotation_matrices(orientations: np.ndarray, scales: np.ndarray = None):
+    """
+    Calculates the scaled rotation matrices of many Quaternions at once.
+
+    This is the vectorized form of Quaternion.get_matrix.
+    :param orientations: a (K, 4) array of unit Quaternions as (w, x, y, z)
+    :param scales: an optional (K,) array of amounts to uniformly scale each matrix by
+    :return: a (K, 3, 3) array of matrices, of the same type as the orientations
+    """
+    w, x, y, z = orientations.T
+    scales = np.ones(len(orientations), dtype=orientations.dtype) if scales is None else scales
+    s = 2 * scales
+    matrices = np.empty((len(orientations), 3, 3), dtype=orientations.dtype)
+    matrices[:, 0, 0] = scales - s * (y * y + z * z)
+    matrices[:, 0, 1] = s * (x * y - w * z)
+    matrices[:, 0, 2] = s * (x * z + w * y)
+    matrices[:, 1, 0] = s * (x * y + w * z)
+    matrices[:, 1, 1] = scales - s * (x * x + z * z)
+    matrices[:, 1, 2] = s * (y * z - w * x)
+    matrices[:, 2, 0] = s * (x * z - w * y)
+    matrices[:, 2, 1] = s * (y * z + w * x)
+    matrices[:, 2, 2] = scales - s * (x * x + y * y)
+    return matrices
+
+
+class InstancedMesh:
+    """
+    Represents many copies of one Mesh, each placed by a few numbers instead of an object of its own.
+
+    Every instance is one row of a structured array holding its position, uniform scale, and orientation, 8 numbers in
+    all, so a million cube instances take 64 MB in float64 and 32 MB in float32, where a million Cubes would each carry
+    a Python object, a Quaternion, and a model matrix. The Mesh is stored once and the instances are only expanded into
+    world space vertices when they are drawn, in a vectorized pass over chunks of at most chunk_size instances at a
+    time, so drawing never needs memory for the whole world space at once.
+
+    In float32 mode the instances, the Mesh's vertices, and the transform all use float32, which halves the memory and
+    the bandwidth of the transform at the cost of precision far from the origin; the projection is always done in
+    float64.
+
+    Attributes:
+        mesh: Mesh
+            the shared shape of every instance
+        instances: numpy.ndarray
+            the (M,) structured array of every instance's "position", "scale", and "orientation", see
+            get_instance_dtype; it can be changed directly
+        dtype: numpy.dtype
+            the floating point type the instances are stored and transformed in
+        chunk_size: int
+            the most instances transformed and projected at once while drawing
+    """
+
+    def __init__(self, mesh: Mesh, count: int = 0, dtype=np.float64, chunk_size: int = INSTANCE_CHUNK_SIZE):
+        """
+        Instantiates a new InstancedMesh.
+
+        :param mesh: the shape of every instance
+        :param count: the number of instances to start with, all at the origin with a scale of 1 and no rotation
+        :param dtype: the floating point type to store and transform the instances in, numpy.float64 or numpy.float32
+        :param chunk_size: the most instances to transform and project at once while drawing
+        """
+        self.mesh = mesh
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self._instances = np.zeros(count, dtype=get_instance_dtype(self.dtype))
+        self._instances["scale"] = 1
+        self._instances["orientation"][:, 0] = 1
+        self._count = count
+        self._rotation_count = 0
+        self._local = mesh.vertices.astype(self.dtype)
+        self._radius = float(np.linalg.norm(mesh.vertices, axis=1).max()) if len(mesh.vertices) > 0 else 0.0
+        self._strip_order, self._strip_lengths = get_strip_order(mesh.edges)
+        self._chunk_strips = None
+
+    def __repr__(self):
+        return f"InstancedMesh({self.mesh}, instances:{self._count}, dtype:{self.dtype})"
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def instances(self):
+        """The structured array of every instance."""
+        return self._instances[:self._count]
+
+    @property
+    def nbytes(self):
+        """The number of bytes taken by the instances, not counting the shared Mesh or room kept to add more."""
+        return self.instances.nbytes
+
+    def add(self, position: Point, scale: float = 1.0, orientation: Quaternion = None):
+        """
+        Adds one instance.
+
+        :param position: the point the instance's local origin is moved to
+        :param scale: how much to uniformly scale the instance from the Mesh
+        :param orientation: the rotation turning the instance from the Mesh's rest pose; no rotation by default
+        :return: the index of the new instance
+        """
+        orientation = orientation if orientation is not None else Quaternion()
+        self.extend(np.array([[position.x, position.y, position.z]]), scale,
+                    np.array([[orientation.w, orientation.x, orientation.y, orientation.z]]))
+        return self._count - 1
+
+    def extend(self, positions: np.ndarray, scales=1.0, orientations: np.ndarray = None):
+        """
+        Adds many instances at once.
+
+        Room for more instances is kept by doubling the array whenever it fills up, so adding instances one at a time
+        doesn't copy every instance each time.
+        :param positions: a (K, 3) array of the points the instances' local origins are moved to
+        :param scales: a (K,) array of how much to uniformly scale each instance, or one scale for all of them
+        :param orientations: a (K, 4) array of unit Quaternions as (w, x, y, z); no rotation by default
+        """
+        positions = np.asarray(positions).reshape(-1, 3)
+        count = self._count + len(positions)
+        if count > len(self._instances):
+            instances = np.empty(max(count, 2 * len(self._instances)), dtype=self._instances.dtype)
+            instances[:self._count] = self.instances
+            self._instances = instances
+        added = self._instances[self._count:count]
+        added["position"] = positions
+        added["scale"] = scales
+        if orientations is None:
+            added["orientation"] = (1, 0, 0, 0)
+        else:
+            added["orientation"] = orientations
+        self._count = count
+
+    def translate(self, x: float, y: float, z: float, selection=slice(None)):
+        """
+        Translates instances through 3D space.
+
+        :param x: the x component of the translation
+        :param y: the y component of the translation
+        :param z: the z component of the translation
+        :param selection: the instances to translate, as anything that indexes the instances array; all by default
+        """
+        self.instances["position"][selection] += np.array((x, y, z), dtype=self.dtype)
+
+    def rotate(self, axis: Vector, rotation: float, selection=slice(None)):
+        """
+        Rotates instances about an axis through each of their positions.
+
+        The rotation is composed into every selected orientation with one matrix multiply, the vectorized form of
+        MeshObject.rotate, and every few rotations all the orientations are normalized.
+        :param axis: the direction of the axis, of any non-zero length
+        :param rotation: the rotation in radians, following the right-hand rule
+        :param selection: the instances to rotate, as anything that indexes the instances array; all by default
+        """
+        quaternion = get_rotation((axis.x, axis.y, axis.z), rotation)
+        w, x, y, z = quaternion.w, quaternion.x, quaternion.y, quaternion.z
+        # multiplying by the rotation on the left is a linear map of the other Quaternion's components
+        product = np.array([
+            [w, -x, -y, -z],
+            [x, w, -z, y],
+            [y, z, w, -x],
+            [z, -y, x, w],
+        ], dtype=self.dtype)
+        orientations = self.instances["orientation"]
+        orientations[selection] = orientations[selection] @ product.T
+        self._rotation_count += 1
+        if self._rotation_count % NORMALIZE_INTERVAL == 0:
+            orientations /= np.linalg.norm(orientations, axis=1, keepdims=True)
+
+    def get_world_vertices(self, selection=slice(None)):
+        """
+        Transforms the Mesh's vertices into world space for some of the instances, in one vectorized pass.
+
+        :param selection: the instances to transform, as anything that indexes the instances array; all by default
+        :return: a (K * V, 3) array of the world space vertices of the K selected instances, one instance after another
+        """
+        return self._transform(self.instances[selection])
+
+    def get_bounding_spheres(self):
+        """
+        Calculates a sphere around every instance.
+
+        :return: an (M, 3) array of centers and an (M,) array of radii
+        """
+        instances = self.instances
+        return instances["position"], instances["scale"] * self._radius
+
+    def draw(self, camera: Camera, screen: pygame.Surface, color=(255, 255, 255)):
+        """
+        Draws every instance on the given Surface.
+
+        The instances are culled, transformed, projected, and drawn chunk_size instances at a time. Instances whose
+        bounding spheres are entirely outside the Camera's frustum are skipped before they are transformed, and edges
+        with one end behind the Camera's near plane are clipped to it.
+        :param camera: the Camera viewing the instances
+        :param screen: the Surface
+        :param color: the color of the edges
+        """
+        center_x = screen.get_width() / 2
+        center_y = screen.get_height() / 2
+        for start in range(0, self._count, self.chunk_size):
+            chunk = self.instances[start:start + self.chunk_size]
+            in_view = camera.spheres_in_frustum(chunk["position"], chunk["scale"] * self._radius, center_x, center_y)
+            if not in_view.any():
+                continue
+            if not in_view.all():
+                chunk = chunk[in_view]
+
+            world = self._transform(chunk)
+            screen_points, visible = camera.project_points(world, center_x, center_y)
+            order, starts, lengths, edges = self._get_chunk_strips(len(chunk))
+            draw_strips(screen, screen_points, visible, order, starts, lengths, color)
+
+            edge_visible = visible[edges]
+            crossing_edges = edges[edge_visible[:, 0] != edge_visible[:, 1]]
+            if len(crossing_edges) == 0:
+                continue
+            points0, points1, _ = camera.clip_to_near(world[crossing_edges[:, 0]], world[crossing_edges[:, 1]])
+            points0, _ = camera.project_points(points0, center_x, center_y)
+            points1, _ = camera.project_points(points1, center_x, center_y)
+            for point0, point1 in zip(points0.tolist(), points1.tolist()):
+                pygame.draw.aaline(screen, color, point0, point1)
+
+    def _transform(self, instances: np.ndarray):
+        """Transforms the Mesh's vertices into world space for a structured array of instances."""
+        rotations = get_rotation_matrices(instances["orientation"], instances["scale"])
+        world = np.matmul(self._local, rotations.transpose(0, 2, 1))
+        world += instances["position"][:, None]
+        return world.reshape(-1, 3)
+
+    def _get_chunk_strips(self, count: int):
+        """
+        Lays out the strips and edges of count instances, one instance after another, built once for a whole chunk.
+
+        :return: the strips' vertex indices, start indices, and lengths, as taken by draw_strips, and an (E, 2) array
+            of edges, all indexing into the world space vertices of the chunk
+        """
+        if self._chunk_strips is None:
+            vertex_count = len(self._local)
+            offsets = np.arange(self.chunk_size)[:, None] * vertex_count
+            order = (offsets + self._strip_order).reshape(-1)
+            lengths = np.tile(self._strip_lengths, self.chunk_size)
+            starts = np.cumsum(lengths) - lengths
+            edges = (offsets[:, :, None] + self.mesh.edges).reshape(-1, 2)
+            self._chunk_strips = (order, starts, lengths, edges)
+        order, starts, lengths, edges = self._chunk_strips
+        strip_count = count * len(self._strip_lengths)
+        return (order[:count * len(self._strip_order)], starts[:strip_count], lengths[:strip_count],
+                edges[:count * len(self.mesh.edges)])
@@ -1,3 +1,5 @@
+import numpy as np
+
 from point import Point
 from vector import Vector
 
@@ -13,6 +15,8 @@ class Line:
             a Vector that represents the direction of the Line from the Point
     """
 
+    __slots__ = ('point', 'direction')
+
     def __init__(self, point: Point, direction: Vector):
         """
         Instantiates a new Line.
@@ -65,3 +69,25 @@ class Line:
 
         else:
             return False
+
+    def has_points(self, points: np.ndarray, epsilon: float = 1e-6):
+        """
+        Determines which of many given points exist on the Line, allowing for floating point error.
+
+        A point is on the Line if its distance from the Line is at most epsilon. The distance from a point p to a line
+        through a with direction d is |(p - a) x d| / |d|, which needs no special cases for zero direction components.
+        More info:
+        https://en.wikipedia.org/wiki/Distance_from_a_point_to_a_line#Vector_formulation
+        :param points: an (N, 3) array of points
+        :param epsilon: the largest distance from the Line that still counts as on it
+        :return: an (N,) boolean array that is True for the points on the Line
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        origin = np.array([self.point.x, self.point.y, self.point.z])
+        direction = np.array([self.direction.x, self.direction.y, self.direction.z])
+        length = np.linalg.norm(direction)
+        offsets = points - origin
+        if length == 0:
+            # a Line without a direction is just its Point
+            return np.linalg.norm(offsets, axis=1) <= epsilon
+        return np.linalg.norm(np.cross(offsets, direction), axis=1) <= epsilon * length
@@ -0,0 +1,277 @@
+"""
+Loading and saving meshes and scenes.
+
+Two formats are supported. Wavefront OBJ files are plain text and can be exchanged with other tools; their vertices
+("v"), faces ("f"), and lines ("l") are read, and everything else is ignored. The binary scene format stores every
+array exactly as it is laid out in memory, so loading a file only memory-maps it and no vertex is parsed or copied
+until it is used:
+
+    header          magic b"CUBESCN\\0", version (u32), mesh count (u32), instance count (u64), instance offset (u64)
+    mesh table      for each mesh: vertex count, edge count, face count, vertices per face, vertex offset, edge offset,
+                    face offset (u64 each)
+    mesh data       for each mesh: its (V, 3) float64 vertices, (E, 2) int64 edges, and (F, K) int64 faces, at the
+                    offsets in the mesh table
+    instances       at the instance offset: an (M,) int64 array of mesh indices, followed by an (M, 4, 4) float64
+                    array of model matrices
+
+Everything is little-endian and every array starts on an 8 byte boundary. An OBJ file can be converted to the binary
+format once, so it loads quickly from then on:
+
+    python loader.py model.obj model.scn
+"""
+import argparse
+import struct
+import sys
+
+import numpy as np
+
+from mesh import Mesh
+from mesh_object import MeshObject
+from point import Point
+from scene import Scene
+
+MAGIC = b"CUBESCN\0"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQ")
+MESH_ENTRY = struct.Struct("<QQQQQQQ")
+VERSION_1_MESH_ENTRY = struct.Struct("<QQQQ")  # version 1 files have no faces, and are still read
+VERTEX_TYPE = np.dtype("<f8")
+INDEX_TYPE = np.dtype("<i8")
+
+
+def load_obj(path: str):
+    """
+    Reads a Mesh from a Wavefront OBJ file.
+
+    Every segment of a line becomes an edge. If the file has no lines, every side of a face becomes an edge instead,
+    and edges shared by more than one face are only kept once. Negative indices count back from the latest vertex, as
+    in the OBJ format. If the faces don't all have the same number of vertices, the shorter ones repeat their last
+    vertex to fill the row, the same way scene.pad_faces does.
+    :param path: the path of the file
+    :return: the Mesh
+    """
+    vertices = []
+    edges = []
+    face_edges = []
+    faces = []
+    with open(path) as file:
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "v":
+                vertices.append(parts[1:4])
+            elif parts[0] == "f" or parts[0] == "l":
+                indices = []
+                for part in parts[1:]:
+                    index = int(part.split("/")[0])
+                    indices.append(index - 1 if index > 0 else len(vertices) + index)
+                if parts[0] == "f":
+                    faces.append(indices)
+                    face_edges.extend(zip(indices, indices[1:] + indices[:1]))
+                else:
+                    edges.extend(zip(indices[:-1], indices[1:]))
+
+    # explicit lines already list every edge, like in the files save_obj writes
+    edges = np.array(edges if edges else face_edges, dtype=np.intp).reshape(-1, 2)
+    if len(edges) > 0:
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+    if faces:
+        width = max(len(face) for face in faces)
+        faces = np.array([face + face[-1:] * (width - len(face)) for face in faces], dtype=np.intp)
+    else:
+        faces = None
+    return Mesh(np.array(vertices, dtype=np.float64).reshape(-1, 3), edges, faces)
+
+
+def save_obj(path: str, mesh: Mesh):
+    """
+    Writes a Mesh to a Wavefront OBJ file, with each face as a face and each edge as a line.
+
+    The vertices a face repeats at the end of its row to fill it are left out, so faces of different sizes are written
+    as they were loaded.
+    :param path: the path of the file
+    :param mesh: the Mesh
+    """
+    faces = mesh.faces + 1
+    # how many vertices before the last one in each row repeat it, which is the padding
+    padding = np.cumprod(faces[:, -2::-1] == faces[:, -1:], axis=1).sum(axis=1)
+    with open(path, "w") as file:
+        np.savetxt(file, mesh.vertices, fmt="v %.17g %.17g %.17g")
+        if not padding.any():
+            np.savetxt(file, faces, fmt="f" + " %d" * faces.shape[1])
+        else:
+            for face, count in zip(faces.tolist(), padding.tolist()):
+                file.write("f " + " ".join(map(str, face[:len(face) - count])) + "\n")
+        np.savetxt(file, mesh.edges + 1, fmt="l %d %d")
+
+
+def read_binary(path: str):
+    """
+    Memory-maps a binary scene file.
+
+    :param path: the path of the file
+    :return: a list of Meshes, an (M,) array of the index of the Mesh of every instance, and an (M, 4, 4) array of the
+        model matrix of every instance; every array is a read-only view into the file
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a scene file")
+    magic, version, mesh_count, instance_count, instance_offset = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a scene file")
+    if version not in (1, VERSION):
+        raise ValueError(f"{path} is a version {version} scene file, but only versions 1 to {VERSION} can be read")
+
+    meshes = []
+    for index in range(mesh_count):
+        if version == 1:
+            vertex_count, edge_count, vertex_offset, edge_offset = VERSION_1_MESH_ENTRY.unpack_from(
+                data, HEADER.size + index * VERSION_1_MESH_ENTRY.size)
+            face_count, face_size, face_offset = 0, 3, 0
+        else:
+            vertex_count, edge_count, face_count, face_size, vertex_offset, edge_offset, face_offset = \
+                MESH_ENTRY.unpack_from(data, HEADER.size + index * MESH_ENTRY.size)
+        vertices = data[vertex_offset:vertex_offset + vertex_count * 3 * VERTEX_TYPE.itemsize].view(VERTEX_TYPE)
+        edges = data[edge_offset:edge_offset + edge_count * 2 * INDEX_TYPE.itemsize].view(INDEX_TYPE)
+        faces = data[face_offset:face_offset + face_count * face_size * INDEX_TYPE.itemsize].view(INDEX_TYPE)
+        meshes.append(Mesh(vertices, edges, faces.reshape(-1, face_size)))
+
+    models_offset = instance_offset + instance_count * INDEX_TYPE.itemsize
+    mesh_indices = data[instance_offset:models_offset].view(INDEX_TYPE)
+    models = data[models_offset:models_offset + instance_count * 16 * VERTEX_TYPE.itemsize].view(VERTEX_TYPE)
+    return meshes, mesh_indices, models.reshape(-1, 4, 4)
+
+
+def write_binary(path: str, meshes, mesh_indices: np.ndarray, models: np.ndarray):
+    """
+    Writes a binary scene file.
+
+    :param path: the path of the file
+    :param meshes: a list of Meshes
+    :param mesh_indices: an (M,) array of the index of the Mesh of every instance
+    :param models: an (M, 4, 4) array of the model matrix of every instance
+    """
+    mesh_indices = np.ascontiguousarray(mesh_indices, dtype=INDEX_TYPE).reshape(-1)
+    models = np.ascontiguousarray(models, dtype=VERTEX_TYPE).reshape(-1, 4, 4)
+    arrays = []
+    for mesh in meshes:
+        arrays.append(np.ascontiguousarray(mesh.vertices, dtype=VERTEX_TYPE))
+        arrays.append(np.ascontiguousarray(mesh.edges, dtype=INDEX_TYPE))
+        arrays.append(np.ascontiguousarray(mesh.faces, dtype=INDEX_TYPE))
+
+    # every array is a whole number of 8 byte items, so each one starts on an 8 byte boundary
+    offset = HEADER.size + len(meshes) * MESH_ENTRY.size
+    offsets = []
+    for array in arrays:
+        offsets.append(offset)
+        offset += array.nbytes
+    instance_offset = offset
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(meshes), len(mesh_indices), instance_offset))
+        for index, mesh in enumerate(meshes):
+            file.write(MESH_ENTRY.pack(len(mesh.vertices), len(mesh.edges), len(mesh.faces), mesh.faces.shape[1],
+                                       *offsets[index * 3:index * 3 + 3]))
+        for array in arrays:
+            file.write(array.tobytes())
+        file.write(mesh_indices.tobytes())
+        file.write(models.tobytes())
+
+
+def load_mesh(path: str):
+    """
+    Reads a Mesh from a Wavefront OBJ file, or the first Mesh from a binary scene file.
+
+    :param path: the path of the file, read as OBJ if it ends in .obj and as a binary scene file otherwise
+    :return: the Mesh
+    """
+    if path.lower().endswith(".obj"):
+        return load_obj(path)
+    meshes, _, _ = read_binary(path)
+    if not meshes:
+        raise ValueError(f"{path} has no meshes")
+    return meshes[0]
+
+
+def save_mesh(path: str, mesh: Mesh):
+    """
+    Writes a Mesh to a Wavefront OBJ file, or to a binary scene file with the Mesh as its only instance.
+
+    :param path: the path of the file, written as OBJ if it ends in .obj and as a binary scene file otherwise
+    :param mesh: the Mesh
+    """
+    if path.lower().endswith(".obj"):
+        save_obj(path, mesh)
+    else:
+        write_binary(path, [mesh], np.zeros(1, dtype=INDEX_TYPE), np.identity(4)[None])
+
+
+def load_scene(path: str):
+    """
+    Reads a Scene from a Wavefront OBJ file or a binary scene file.
+
+    An OBJ file becomes a Scene with one MeshObject at the origin. Every instance in a binary scene file becomes a
+    MeshObject sharing the memory-mapped Mesh it uses, so a Scene of many copies of one Mesh holds that Mesh only once.
+    The model matrices are read in bulk and the objects' orientations are only worked out when they are first needed.
+    :param path: the path of the file, read as OBJ if it ends in .obj and as a binary scene file otherwise
+    :return: the Scene
+    """
+    scene = Scene()
+    if path.lower().endswith(".obj"):
+        scene.add(MeshObject(load_obj(path), Point(0, 0, 0)))
+        return scene
+    meshes, mesh_indices, models = read_binary(path)
+    # every model matrix is copied out of the file at once, and each object uses its row of the copy until it is packed
+    models = np.array(models, dtype=np.float64)
+    scales = np.linalg.norm(models[:, :3, 0], axis=1)
+    for mesh_index, model, scale in zip(mesh_indices.tolist(), models, scales.tolist()):
+        scene.add(MeshObject(meshes[mesh_index], scale=scale, model=model))
+    return scene
+
+
+def save_scene(path: str, scene: Scene):
+    """
+    Writes a Scene to a binary scene file.
+
+    Objects sharing a Mesh share it in the file as well. An object with its own vertices, like a Cube after one of its
+    vertices is moved on its own, is written with its own Mesh.
+    :param path: the path of the file
+    :param scene: the Scene
+    """
+    meshes = []
+    mesh_numbers = {}
+    mesh_indices = []
+    for obj in scene.objects:
+        face_indices = getattr(obj, "face_indices", None)
+        if obj.local.flags.writeable:
+            mesh_numbers[id(obj)] = len(meshes)
+            meshes.append(Mesh(obj.local, obj.edge_indices, face_indices))
+            mesh_indices.append(mesh_numbers[id(obj)])
+            continue
+        key = (id(obj.local), id(obj.edge_indices), id(face_indices))
+        if key not in mesh_numbers:
+            mesh_numbers[key] = len(meshes)
+            meshes.append(Mesh(obj.local, obj.edge_indices, face_indices))
+        mesh_indices.append(mesh_numbers[key])
+    models = np.array([obj.model for obj in scene.objects]).reshape(-1, 4, 4)
+    write_binary(path, meshes, np.array(mesh_indices, dtype=INDEX_TYPE), models)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Converts a mesh between Wavefront OBJ and the binary scene format.")
+    parser.add_argument("input", help="the mesh to read, as OBJ if it ends in .obj and as a binary scene otherwise")
+    parser.add_argument("output", help="the mesh to write, as OBJ if it ends in .obj and as a binary scene otherwise")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    mesh = load_mesh(args.input)
+    save_mesh(args.output, mesh)
+    print(f"wrote {mesh} to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,22 @@
+import argparse
 import sys
 
+import numpy as np
 import pygame as pygame
 
 from point import Point
-from cube import Cube, draw_cube
+from cube import Cube
 from camera import Camera
+from dirty import DirtyRects
+from impostor import ImpostorCache
+from loader import load_scene
+from parallel import ParallelSimulation, Spin
+from pipeline import FramePipeline
+from profiler import FrameProfiler
+from scene import Scene
+from spatial import SpatialGrid
+from timestep import FixedTimestep
+from vector import Vector
 
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -19,28 +31,161 @@ CENTER_Y = SCREEN_HEIGHT / 2
 LARGE_FONT_SIZE = int(SCREEN_WIDTH * 0.03)
 SMALL_FONT_SIZE = int(SCREEN_WIDTH * 0.015)
 
+SIMULATION_RATE = 120  # simulation steps per second
+TRANSLATE_SPEED = 1000  # units per second
+ROTATE_SPEED = 0.5  # radians per second
+TURN_SPEED = 1.0  # radians per second the camera turns at
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Draws a rotating wireframe cube.")
+    parser.add_argument("--fps", type=int, default=60, help="the most frames to draw per second, 0 for no limit")
+    parser.add_argument("--vsync", action="store_true", help="wait for the display's vertical sync between frames")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only clear and update the parts of the screen that changed")
+    parser.add_argument("--no-overlay", action="store_true", help="hide the frame timing overlay")
+    parser.add_argument("--stats", metavar="PATH", help="write frame timing statistics to a .csv or .json file on exit")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="run the simulation in this many worker processes, 0 to run it in the main loop")
+    style = parser.add_mutually_exclusive_group()
+    style.add_argument("--solid", action="store_true", help="draw filled, shaded faces instead of edges")
+    style.add_argument("--impostors", action="store_true", help="draw distant objects as cached wireframe sprites")
+    parser.add_argument("--scene", metavar="PATH",
+                        help="draw the objects in an OBJ or binary scene file instead of the cube")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="simulate and project the next frame on a worker thread while the current one is drawn")
+    parser.add_argument("--grid", type=float, metavar="CELL_SIZE",
+                        help="cull with a spatial grid of cells this size, and select the object clicked on")
+    args = parser.parse_args()
+    if args.pipelined and (args.solid or args.impostors):
+        parser.error("--pipelined only draws edges, and can't be used with --solid or --impostors")
+    if args.pipelined and args.grid:
+        parser.error("--grid can't be used with --pipelined, since the worker thread owns the Scene while projecting")
+    return args
+
 
 if __name__ == '__main__':
+    args = parse_args()
     pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if args.vsync:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1)
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    large_font = pygame.font.Font(None, LARGE_FONT_SIZE)
+    small_font = pygame.font.Font(None, SMALL_FONT_SIZE)
 
     camera = Camera(Point(0, 0, 0), 1000)  # camera is positioned at origin and viewport is a plane at (1000, 0, 0)
-    cube = Cube(Point(3000, 0, 0), 1000)
+    if args.scene:
+        scene = load_scene(args.scene)
+    else:
+        scene = Scene()
+        scene.add(Cube(Point(3000, 0, 0), 1000))
+    profiler = FrameProfiler()
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(1 / SIMULATION_RATE)
+    dirty_rects = DirtyRects(screen, BLACK) if args.dirty_rects else None
+    grid = SpatialGrid(scene, args.grid) if args.grid else None
+    selected = None  # the (M,) mask of the object clicked on, if any
+    impostors = ImpostorCache() if args.impostors else None
+    simulation = ParallelSimulation(scene, Spin(Vector(0, 0, 1), ROTATE_SPEED), args.processes) \
+        if args.processes else None
+    pipeline = FramePipeline(scene, camera, CENTER_X, CENTER_Y, simulation, dirty_rects is not None) \
+        if args.pipelined else None
+
+    def simulate(keys, elapsed: float):
+        """Runs the simulation steps for the time elapsed since the last frame, and returns the alpha to draw at."""
+        for _ in range(timestep.advance(elapsed)):
+            if simulation is not None:
+                # the workers save the previous state and spin the objects
+                simulation.step(1, timestep.step)
+            else:
+                scene.save_state()
+                for obj in scene:
+                    obj.rotate_z(ROTATE_SPEED * timestep.step)
+            if keys[pygame.K_w]:
+                for obj in scene:
+                    obj.translate(TRANSLATE_SPEED * timestep.step, 0, 0)
+            if keys[pygame.K_s]:
+                for obj in scene:
+                    obj.translate(-TRANSLATE_SPEED * timestep.step, 0, 0)
+            # the arrow keys turn the camera about the world's vertical axis and its own horizontal axis
+            if keys[pygame.K_LEFT]:
+                camera.rotate(Vector(0, 0, 1), -TURN_SPEED * timestep.step)
+            if keys[pygame.K_RIGHT]:
+                camera.rotate(Vector(0, 0, 1), TURN_SPEED * timestep.step)
+            if keys[pygame.K_UP]:
+                camera.rotate(camera.right, TURN_SPEED * timestep.step)
+            if keys[pygame.K_DOWN]:
+                camera.rotate(camera.right, -TURN_SPEED * timestep.step)
+        return timestep.alpha
 
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-        translate_speed = 10
-        if pygame.key.get_pressed()[pygame.K_w]:
-            cube.translate(translate_speed, 0, 0)
-        if pygame.key.get_pressed()[pygame.K_s]:
-            cube.translate(-translate_speed, 0, 0)
-
-        draw_cube(cube, camera, screen)
-        cube.rotate_z(0.001)
-
-        pygame.display.update()
-        screen.fill(BLACK)
+        elapsed = clock.tick(args.fps) / 1000
+        profiler.begin_frame()
+        with profiler.stage("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    if args.stats:
+                        profiler.dump(args.stats)
+                    if pipeline is not None:
+                        pipeline.close()
+                    if simulation is not None:
+                        simulation.close()
+                    pygame.quit()
+                    sys.exit()
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and grid is not None:
+                    # the grid was last updated for the frame on screen, so it picks what was clicked on
+                    hit = grid.ray_pick(*camera.get_ray(*event.pos, CENTER_X, CENTER_Y))
+                    selected = None
+                    if hit is not None:
+                        selected = np.zeros(len(scene.packed_objects), dtype=bool)
+                        selected[scene.packed_objects.index(hit[0])] = True
+            keys = pygame.key.get_pressed()
+
+        if pipeline is not None:
+            # the worker thread simulates and projects the next frame while this one is drawn
+            pipeline.submit(simulate, keys, elapsed)
+        else:
+            with profiler.stage("update"):
+                alpha = simulate(keys, elapsed)
+            with profiler.stage("project"):
+                world = simulation.get_world_vertices(alpha) if simulation is not None else None
+                if grid is not None:
+                    grid.update()
+                screen_points, visible = scene.project(camera, CENTER_X, CENTER_Y, alpha, index=grid, world=world)
+        with profiler.stage("draw"):
+            if pipeline is not None:
+                if dirty_rects is not None:
+                    dirty_rects.clear()
+                    if pipeline.front.bounds is not None:
+                        dirty_rects.add_bounds(pipeline.front.bounds)
+                pipeline.draw(screen)
+            else:
+                if dirty_rects is not None:
+                    dirty_rects.clear()
+                    dirty_rects.add_bounds(scene.get_screen_bounds(screen_points, visible))
+                if args.solid:
+                    scene.draw_faces_projected(screen, camera, screen_points, visible, world=world)
+                elif impostors is not None:
+                    drawn = impostors.draw(scene, camera, screen, screen_points, visible, alpha)
+                    scene.draw_projected(screen, screen_points, visible, object_mask=~drawn)
+                else:
+                    scene.draw_projected(screen, screen_points, visible)
+                if selected is not None:
+                    scene.draw_projected(screen, screen_points, visible, RED, object_mask=selected)
+        if not args.no_overlay:
+            with profiler.stage("overlay"):
+                overlay_rect = profiler.draw(screen, large_font, small_font, WHITE)
+                if dirty_rects is not None:
+                    dirty_rects.add(overlay_rect)
+
+        with profiler.stage("display"):
+            if dirty_rects is not None:
+                dirty_rects.update()
+            else:
+                pygame.display.update()
+                screen.fill(BLACK)
+        if pipeline is not None:
+            with profiler.stage("wait"):
+                pipeline.swap()
+        profiler.end_frame()
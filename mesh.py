@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class Mesh:
+    """
+    Represents the shape of an object as a table of vertices, a table of the edges between them, and an optional table
+    of the faces they enclose.
+
+    A Mesh is immutable, so one Mesh can be shared by every object with the same shape. Anything that depends on where
+    an object currently is, like the direction of its edges, is computed on demand from the object's own vertex
+    positions. Arrays that are already read-only and of the right type, like ones memory-mapped from a file, are used
+    as they are instead of being copied.
+
+    Attributes:
+        vertices: numpy.ndarray
+            a read-only (V, 3) float64 array of vertex positions
+        edges: numpy.ndarray
+            a read-only (E, 2) array of the pairs of vertex indices that make up the Mesh's edges
+        faces: numpy.ndarray
+            a read-only (F, K) array of the vertex indices around each of the Mesh's flat, convex faces,
+            counterclockwise when looking at the face from outside the Mesh, so the right-hand rule gives the face's
+            outward normal; (0, 3) for a Mesh that is only a wireframe
+    """
+
+    def __init__(self, vertices, edges, faces=None):
+        """
+        Instantiates a new Mesh.
+
+        :param vertices: a (V, 3) array of vertex positions
+        :param edges: an (E, 2) array of the pairs of vertex indices that make up the Mesh's edges
+        :param faces: an optional (F, K) array of the vertex indices around each face, counterclockwise from outside
+        """
+        self.vertices = get_read_only(vertices, np.float64).reshape(-1, 3)
+        self.edges = get_read_only(edges, np.intp).reshape(-1, 2)
+        self.faces = get_read_only(faces if faces is not None else np.empty((0, 3)), np.intp)
+        if self.faces.ndim != 2 or self.faces.shape[1] < 3:
+            raise ValueError(f"faces must be an (F, K) array with at least 3 vertices per face, not {self.faces.shape}")
+
+    def __repr__(self):
+        return f"Mesh({len(self.vertices)} vertices,{len(self.edges)} edges,{len(self.faces)} faces)"
+
+    def get_edge_vectors(self, positions: np.ndarray):
+        """
+        Calculates the vector from the first to the second end of every edge.
+
+        :param positions: a (V, 3) array of the current vertex positions
+        :return: an (E, 3) array of edge vectors
+        """
+        return positions[self.edges[:, 1]] - positions[self.edges[:, 0]]
+
+
+def get_read_only(values, dtype):
+    """
+    Gets a read-only array of some values, only copying them if they could otherwise still be changed.
+
+    :param values: an array or a nested sequence of values
+    :param dtype: the type the array should have
+    :return: a read-only array
+    """
+    if isinstance(values, np.ndarray) and values.dtype == dtype and not values.flags.writeable:
+        return values
+    array = np.array(values, dtype=dtype)
+    array.flags.writeable = False
+    return array
+
+
+# a cube with faces of length 1 centered on the origin
+CUBE_MESH = Mesh(
+    vertices=[
+        (0.5, 0.5, 0.5),
+        (0.5, 0.5, -0.5),
+        (-0.5, 0.5, -0.5),
+        (-0.5, 0.5, 0.5),
+        (0.5, -0.5, 0.5),
+        (0.5, -0.5, -0.5),
+        (-0.5, -0.5, -0.5),
+        (-0.5, -0.5, 0.5),
+    ],
+    edges=[
+        # top face
+        (0, 1), (1, 2), (2, 3), (3, 0),
+        # bottom face
+        (4, 5), (5, 6), (6, 7), (7, 4),
+        # connecting edges between two faces
+        (0, 4), (1, 5), (2, 6), (3, 7),
+    ],
+    faces=[
+        (0, 1, 2, 3), (4, 7, 6, 5),  # y = 0.5 and y = -0.5
+        (0, 4, 5, 1), (3, 2, 6, 7),  # x = 0.5 and x = -0.5
+        (0, 3, 7, 4), (1, 5, 6, 2),  # z = 0.5 and z = -0.5
+    ],
+)
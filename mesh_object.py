@@ -0,0 +1,336 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from edge import Edge
+from mesh import Mesh
+from point import Point, BufferPoint, ViewPoint
+from quaternion import Quaternion, from_matrix, get_rotation
+from scene import draw_faces
+from transform import transform_points
+from vector import Vector
+
+NORMALIZE_INTERVAL = 64  # the number of rotations between removing rounding errors from an object's orientation
+PROJECTION_CACHE_SIZE = 1024  # the most objects a ProjectionCache keeps screen positions for
+X_AXIS = Vector(1, 0, 0)
+Y_AXIS = Vector(0, 1, 0)
+Z_AXIS = Vector(0, 0, 1)
+
+
+class MeshObject:
+    """
+    Represents an object in 3D space with the shape of a Mesh.
+
+    The Mesh is the object's rest pose, and is shared with every other object of the same shape. The object's uniform
+    scale, orientation, and position are composed into a 4x4 model matrix, and the world space vertices are only
+    recomputed from the rest pose through the model matrix when something asks for them, so rotating an object never
+    moves its vertices by small steps and its shape can't drift.
+
+    Attributes:
+        position: Point
+            the point the object's local origin is moved to
+        scale: float
+            how much the object is uniformly scaled from its Mesh
+        orientation: Quaternion
+            the rotation turning the object from its rest pose
+        mesh: Mesh
+            the shared shape of the object
+        local: numpy.ndarray
+            a (V, 3) array holding the positions of the object's vertices before the model matrix is applied; this is
+            the shared, read-only mesh.vertices until one of the object's vertices is moved on its own
+        model: numpy.ndarray
+            the 4x4 matrix that transforms the local vertices into world space
+        buffer: numpy.ndarray
+            a (V, 3) float64 array holding the world space positions of the object's vertices
+        vertices: list[BufferPoint]
+            the object's vertices, each one a view into a row of the buffer
+        edges: list[Edge]
+            the object's edges, built from the vertices
+        edge_indices: numpy.ndarray
+            the shared (E, 2) array of the pairs of vertex indices that make up the object's edges
+        version: int
+            a counter bumped every time the object moves, turns, or changes shape, so anything computed from it can
+            tell whether it is out of date
+        face_indices: numpy.ndarray
+            the shared (F, K) array of the vertex indices around each of the object's faces
+        scene: Scene
+            the Scene the object is packed into, or None
+    """
+
+    def __init__(self, mesh: Mesh, position: Point = None, scale: float = 1.0, orientation: Quaternion = None,
+                 model: np.ndarray = None):
+        """
+        Instantiates a new MeshObject.
+
+        :param mesh: the object's shape
+        :param position: the point the object's local origin is moved to
+        :param scale: how much to uniformly scale the object from its Mesh
+        :param orientation: the rotation turning the object from its rest pose; no rotation by default
+        :param model: a 4x4 float64 model matrix, made of the given scale, a rotation, and a translation, to use as is
+            instead of building one from position and orientation; the orientation is only read back from it the first
+            time it is needed
+        """
+        self.scale = scale
+        self.mesh = mesh
+        self.local = self.mesh.vertices
+        self.version = 0
+        self.scene = None
+        if model is not None:
+            self.model = model
+            self._orientation = None
+        else:
+            self.model = np.identity(4)
+            self.model[:3, 3] = (position.x, position.y, position.z)
+            self.orientation = orientation if orientation is not None else Quaternion()
+        self._rotation_count = 0
+        self._world = None
+        self._world_is_stale = True
+
+    def __repr__(self):
+        return f"MeshObject({self.mesh},{self.position},{self.scale})"
+
+    @property
+    def position(self):
+        """
+        The point the object's local origin is moved to, as a ViewPoint of the model matrix's translation, so
+        changing one of its components moves the object.
+        """
+        return ViewPoint(self.model[:3, 3], self._moved)
+
+    @position.setter
+    def position(self, position: Point):
+        self.model[:3, 3] = (position.x, position.y, position.z)
+        self._moved()
+
+    def _moved(self):
+        """Marks the world space vertices as out of date after the model matrix changes."""
+        self._world_is_stale = True
+        self.version += 1
+
+    @property
+    def orientation(self):
+        """The rotation turning the object from its rest pose."""
+        if self._orientation is None:
+            self._orientation = from_matrix(self.model[:3, :3] / self.scale)
+        return self._orientation
+
+    @orientation.setter
+    def orientation(self, orientation: Quaternion):
+        self._orientation = orientation
+        self.model[:3, :3] = orientation.get_matrix(self.scale)
+        self._world_is_stale = True
+        self.version += 1
+
+    @property
+    def edge_indices(self):
+        """The shared pairs of vertex indices that make up the object's edges."""
+        return self.mesh.edges
+
+    @property
+    def face_indices(self):
+        """The shared vertex indices around each of the object's faces."""
+        return self.mesh.faces
+
+    @property
+    def vertices(self):
+        """The object's vertices, each one a view into a row of the buffer."""
+        return [BufferPoint(self, index) for index in range(len(self.local))]
+
+    @property
+    def edges(self):
+        """The object's edges, built on demand from the vertices."""
+        vertices = self.vertices
+        return [Edge(vertices[index0], vertices[index1]) for index0, index1 in self.edge_indices.tolist()]
+
+    def get_edge_vectors(self):
+        """
+        Calculates the vector along every one of the object's edges from the current vertex positions.
+
+        :return: an (E, 3) array of edge vectors
+        """
+        return self.mesh.get_edge_vectors(self.buffer)
+
+    @property
+    def buffer(self):
+        """The world space positions of the object's vertices, recomputed only if the model matrix has changed."""
+        if self._world is None:
+            self._world = np.empty(self.local.shape)
+        if self._world_is_stale:
+            transform_points(self.model, self.local, out=self._world)
+            self._world_is_stale = False
+        return self._world
+
+    def set_vertex(self, index: int, axis: int, value: float):
+        """
+        Moves one of the object's vertices along a single world space axis.
+
+        The moved vertex is mapped back into local space so the change survives later rotations and translations. The
+        first time this happens, the object stops sharing its Mesh's vertices and gets its own copy, and the Scene it is
+        packed into, if any, is packed again so it picks up the copy.
+        :param index: the index of the vertex
+        :param axis: the axis to move along, 0 for x, 1 for y, and 2 for z
+        :param value: the vertex's new position along the axis
+        """
+        world = self.buffer[index].copy()
+        world[axis] = value
+        if not self.local.flags.writeable:
+            self.local = self.local.copy()
+            if self.scene is not None:
+                self.scene.request_pack()
+        self.local[index] = np.linalg.solve(self.model[:3, :3], world - self.model[:3, 3])
+        self._world_is_stale = True
+        self.version += 1
+
+    def transform(self, matrix: np.ndarray):
+        """
+        Applies a rigid transform, made of rotations and translations, to the object in world space.
+
+        :param matrix: a 4x4 rigid transform matrix in world space
+        """
+        self.model[:3, 3] = matrix[:3, :3] @ self.model[:3, 3] + matrix[:3, 3]
+        self.orientation = from_matrix(matrix) * self.orientation
+
+    def translate(self, x: float, y: float, z: float):
+        """
+        Translates the object through 3D space.
+        :param x: the x component of the translation
+        :param y: the y component of the translation
+        :param z: the z component of the translation
+        """
+        self.model[:3, 3] += (x, y, z)
+        self._world_is_stale = True
+        self.version += 1
+
+    def rotate(self, axis: Vector, rotation: float):
+        """
+        Rotates the object about an axis through its position.
+
+        The rotation is looked up in a cache and composed into the object's orientation with a single Quaternion
+        multiply. Every few rotations the orientation is normalized, so rounding errors can't build up into scaling or
+        shearing no matter how many small rotations are applied.
+        :param axis: the direction of the axis, of any non-zero length
+        :param rotation: the rotation in radians, following the right-hand rule
+        """
+        orientation = get_rotation((axis.x, axis.y, axis.z), rotation) * self.orientation
+        self._rotation_count += 1
+        if self._rotation_count % NORMALIZE_INTERVAL == 0:
+            orientation = orientation.get_unit_quaternion()
+        self.orientation = orientation
+
+    def rotate_x(self, rotation: float):
+        """
+        Rotates the object about the x axis through its position.
+        :param rotation: the rotation in radians
+        """
+        # rotate_x and rotate_y have always turned against the right-hand rule
+        self.rotate(X_AXIS, -rotation)
+
+    def rotate_y(self, rotation: float):
+        """
+        Rotates the object about the y axis through its position.
+        :param rotation: the rotation in radians
+        """
+        self.rotate(Y_AXIS, -rotation)
+
+    def rotate_z(self, rotation: float):
+        """
+        Rotates the object about the z axis through its position.
+        :param rotation: the rotation in radians
+        """
+        self.rotate(Z_AXIS, rotation)
+
+
+class ProjectionCache:
+    """
+    Keeps the screen positions of single objects' vertices between frames.
+
+    An object's screen positions are reused for as long as neither its version nor the Camera's version changes, so an
+    object that hasn't moved under a Camera that hasn't moved is never projected again. The least recently drawn
+    objects are evicted once more than max_size are kept, and an object that leaves the Camera's view entirely is
+    evicted right away. The model matrices of objects in a ParallelSimulation change without their versions changing,
+    so those objects shouldn't be drawn through a ProjectionCache.
+
+    Attributes:
+        max_size: int
+            the most objects to keep screen positions for
+    """
+
+    def __init__(self, max_size: int = PROJECTION_CACHE_SIZE):
+        """
+        Instantiates a new, empty ProjectionCache.
+
+        :param max_size: the most objects to keep screen positions for
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def __repr__(self):
+        return f"ProjectionCache(max_size:{self.max_size}, objects:{len(self._entries)})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def project(self, obj: MeshObject, camera: Camera, center_x: float, center_y: float):
+        """
+        Projects an object's vertices onto the screen, or looks up their screen positions if nothing has moved.
+
+        :param obj: the MeshObject
+        :param camera: the Camera viewing the MeshObject
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: a (V, 2) array of screen positions and a (V,) boolean visibility mask, which must not be modified
+        """
+        settings = (obj, obj.version, camera, camera.version, center_x, center_y)
+        entry = self._entries.get(id(obj))
+        if entry is not None and entry[0] == settings:
+            self._entries.move_to_end(id(obj))
+            return entry[1], entry[2]
+
+        screen_points, visible = camera.project_points(obj.buffer, center_x, center_y)
+        if visible.any():
+            self._entries[id(obj)] = (settings, screen_points, visible)
+            self._entries.move_to_end(id(obj))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.pop(id(obj), None)
+        return screen_points, visible
+
+    def clear(self):
+        """Forgets every object's screen positions."""
+        self._entries.clear()
+
+
+def draw_object(obj: MeshObject, camera: Camera, screen: pygame.Surface, color=(255, 255, 255), solid: bool = False,
+                cache: ProjectionCache = None):
+    """
+    Draws a MeshObject on the given Surface, edge by edge, or with its faces filled.
+
+    A Scene draws many objects much faster; this is for drawing a single object on its own.
+    :param obj: the MeshObject
+    :param camera: the Camera viewing the MeshObject
+    :param screen: the Surface
+    :param color: the color of the edges, or of the faces seen head on
+    :param solid: whether to draw the object's faces filled, see scene.draw_faces, instead of its edges
+    :param cache: an optional ProjectionCache, which saves projecting objects that haven't moved again
+    """
+    center_x = screen.get_width() / 2
+    center_y = screen.get_height() / 2
+    if cache is not None:
+        screen_points, visible = cache.project(obj, camera, center_x, center_y)
+    else:
+        screen_points, visible = camera.project_points(obj.buffer, center_x, center_y)
+    if solid:
+        draw_faces(screen, camera, obj.buffer, screen_points, visible, obj.face_indices, color=color)
+        return
+    for index0, index1 in obj.edge_indices.tolist():
+        if visible[index0] and visible[index1]:
+            pygame.draw.aaline(screen, color, screen_points[index0], screen_points[index1], 1)
+        elif visible[index0] or visible[index1]:
+            # one end is behind the camera's near plane, so only draw the part of the edge in front of it
+            points0, points1, _ = camera.clip_to_near(obj.buffer[index0], obj.buffer[index1])
+            (point0,), _ = camera.project_points(points0, center_x, center_y)
+            (point1,), _ = camera.project_points(points1, center_x, center_y)
+            pygame.draw.aaline(screen, color, point0, point1, 1)
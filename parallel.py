@@ -0,0 +1,288 @@
+import multiprocessing
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from quaternion import from_axis_angle, from_matrix
+from scene import Scene
+from vector import Vector
+
+
+class ParallelSimulation:
+    """
+    Runs the simulation steps and vertex transforms of a Scene across a pool of worker processes.
+
+    The Scene's shared arrays are allocated in shared memory, so the workers and the main process all see the same model
+    matrices and world space vertices, and nothing but short commands is sent between them each frame. The packed
+    objects are split into one contiguous run per worker. Each worker steps the model matrices of its own objects with
+    an update function, and transforms its own objects' vertices into the Scene's world vertex array, which the main
+    process then projects and draws directly.
+
+    The update function is called as update(models, step), where models is the worker's (K, 4, 4) slice of the Scene's
+    model matrices, to be changed in place, and step is the length of the simulation step in seconds. It must be
+    picklable, so a module level function or an instance of a module level class like Spin. Since the workers change
+    the model matrices directly, the objects' own rotate methods shouldn't be used while the simulation runs, and an
+    object's state that isn't stored in its model matrix, like a Cube's orientation, is only brought up to date when
+    the simulation is closed.
+
+    If objects are added to or removed from the Scene, the Scene is packed again and the workers are restarted the next
+    time they are used.
+
+    Attributes:
+        scene: Scene
+            the Scene being simulated
+        update: callable
+            the function that steps a slice of model matrices
+        processes: int
+            the number of worker processes
+    """
+
+    def __init__(self, scene: Scene, update, processes: int = None):
+        """
+        Instantiates a new ParallelSimulation and starts its worker processes.
+
+        :param scene: the Scene to simulate
+        :param update: the function that steps a slice of model matrices, see the class description
+        :param processes: the number of worker processes; the number of CPUs by default
+        """
+        self.scene = scene
+        self.update = update
+        self.processes = processes or multiprocessing.cpu_count()
+        self._blocks = []
+        self._connections = []
+        self._workers = []
+        self._objects = None
+        self.scene.allocate = self._allocate
+        self.scene.pack()
+        self._start()
+
+    def __repr__(self):
+        return f"ParallelSimulation(processes:{self.processes}, objects:{len(self.scene.packed_objects)})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def step(self, count: int, step: float):
+        """
+        Runs some number of simulation steps on every object.
+
+        Before every step, each worker saves its objects' model matrices as the previous simulation state, the same way
+        Scene.save_state does, so the Scene can still interpolate between the last two states.
+        :param count: the number of steps to run
+        :param step: the length of one step in seconds
+        """
+        if count > 0:
+            self._run("step", count, step)
+
+    def get_world_vertices(self, alpha: float = None):
+        """
+        Transforms every object's local vertices into world space, with every worker transforming its own objects.
+
+        :param alpha: how far to interpolate from the previous to the latest simulation state, see Scene.get_models
+        :return: the Scene's (N, 3) array of world space vertices, which can be passed straight to Scene.project
+        """
+        self._run("transform", alpha)
+        return self.scene.get_arrays()["world"]
+
+    def close(self):
+        """
+        Stops the worker processes and moves the Scene's arrays back out of shared memory.
+
+        The objects keep working on their own afterwards, just without the workers. Every object with an orientation
+        gets it back from its final model matrix, so rotating it afterwards carries on from where the workers left it.
+        """
+        self._stop()
+        self.scene.allocate = np.empty
+        self.scene.pack()
+        self._release_unused()
+        for obj in self.scene.packed_objects:
+            if hasattr(obj, "orientation"):
+                obj.orientation = from_matrix(obj.model[:3, :3] / obj.scale)
+
+    def _allocate(self, shape):
+        """Makes an uninitialized float64 array in a new block of shared memory."""
+        size = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._blocks.append(block)
+        return np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+    def _start(self):
+        """Starts one worker for each run of objects in the Scene, which must already be packed into shared memory."""
+        self.scene.save_state()
+        self._release_unused()
+        self._objects = self.scene.packed_objects
+
+        arrays = self.scene.get_arrays()
+        # empty arrays aren't in any block, and the workers just make their own
+        blocks = {name: (getattr(self._find_block(array), "name", None), array.shape) for name, array in arrays.items()}
+        local_address = arrays["local"].__array_interface__["data"][0]
+        object_count = len(self._objects)
+        bounds = np.linspace(0, object_count, min(self.processes, max(object_count, 1)) + 1).astype(int).tolist()
+        context = multiprocessing.get_context()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            pieces = []
+            for piece_start, piece_end, vertex_start, vertex_count, local in self.scene.get_groups(start, end):
+                # shared meshes are read-only and small, so they are sent once; own vertices are found in shared memory
+                if local.ndim == 3:
+                    local = (local.__array_interface__["data"][0] - local_address) // local.strides[1]
+                pieces.append((piece_start, piece_end, vertex_start, vertex_count, local))
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(target=run_worker, args=(worker_connection, blocks, start, end, pieces,
+                                                              self.update), daemon=True)
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def _stop(self):
+        """Stops the worker processes."""
+        for connection in self._connections:
+            try:
+                connection.send(("stop",))
+            except (BrokenPipeError, ConnectionResetError):
+                # the worker has already exited
+                pass
+            connection.close()
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def _run(self, *command):
+        """Sends a command to every worker and waits for all of them to finish it."""
+        # packs the Scene again if objects were added or removed, and then the workers have to start over
+        self.scene.get_arrays()
+        if self.scene.packed_objects is not self._objects:
+            self._stop()
+            self._start()
+        for connection in self._connections:
+            connection.send(command)
+        errors = [error for error in (connection.recv() for connection in self._connections) if error is not None]
+        if errors:
+            raise RuntimeError(f"a simulation worker failed:\n{errors[0]}")
+
+    def _find_block(self, array: np.ndarray):
+        """Finds the block of shared memory an array was allocated in, or None if it isn't in shared memory."""
+        for block in self._blocks:
+            if np.may_share_memory(array, np.ndarray(block.size, dtype=np.uint8, buffer=block.buf)):
+                return block
+        return None
+
+    def _release_unused(self):
+        """Frees the blocks of shared memory that none of the Scene's arrays are in anymore."""
+        used = [self._find_block(array) for array in self.scene.get_arrays().values() if array is not None]
+        for block in self._blocks:
+            if any(block is other for other in used):
+                continue
+            try:
+                block.close()
+            except BufferError:
+                # an array made from the block is still referenced somewhere; the memory is freed along with it
+                pass
+            block.unlink()
+        self._blocks = [block for block in self._blocks if any(block is other for other in used)]
+
+
+class Spin:
+    """
+    An update function for ParallelSimulation that spins every object about an axis through its own center.
+
+    Attributes:
+        axis: Vector
+            the axis to spin about
+        speed: float
+            the speed to spin at in radians per second, following the right-hand rule
+    """
+
+    def __init__(self, axis: Vector, speed: float):
+        """
+        Instantiates a new Spin.
+
+        :param axis: the axis to spin about
+        :param speed: the speed to spin at in radians per second
+        """
+        self.axis = axis
+        self.speed = speed
+        self._step = None
+        self._rotation = None
+
+    def __repr__(self):
+        return f"Spin(axis:{self.axis}, speed:{self.speed})"
+
+    def __call__(self, models: np.ndarray, step: float):
+        """
+        Spins a slice of model matrices by one simulation step.
+
+        :param models: a (K, 4, 4) array of model matrices, changed in place
+        :param step: the length of the step in seconds
+        """
+        if step != self._step:
+            self._step = step
+            self._rotation = from_axis_angle(self.axis, self.speed * step).get_matrix()
+        models[:, :3, :3] = self._rotation @ models[:, :3, :3]
+
+
+def run_worker(connection, blocks: dict, start: int, end: int, pieces: list, update):
+    """
+    Runs one ParallelSimulation worker until it is told to stop.
+
+    :param connection: the worker's end of the Pipe to the main process
+    :param blocks: the name and shape of the shared memory block holding each of the Scene's arrays
+    :param start: the index of the worker's first object
+    :param end: the index after the worker's last object
+    :param pieces: the parts of the Scene's groups that fall in the worker's run of objects, as (start, end,
+        vertex_start, vertex_count, local) tuples, where local is a shared Mesh's vertices or the row of the shared
+        local array that the objects' own vertices start at
+    :param update: the function that steps the worker's model matrices
+    """
+    attached = {}
+    arrays = {}
+    for name, (block_name, shape) in blocks.items():
+        if block_name is None:
+            arrays[name] = np.empty(shape)
+            continue
+        attached[name] = shared_memory.SharedMemory(name=block_name)
+        arrays[name] = np.ndarray(shape, dtype=np.float64, buffer=attached[name].buf)
+    models = arrays["models"][start:end]
+    previous = arrays["previous_models"][start:end]
+    world = arrays["world"]
+    blended = np.empty_like(models)
+
+    while True:
+        command = connection.recv()
+        if command[0] == "stop":
+            break
+        try:
+            if command[0] == "step":
+                _, count, step = command
+                for _ in range(count):
+                    previous[:] = models
+                    update(models, step)
+            elif command[0] == "transform":
+                _, alpha = command
+                if alpha is None:
+                    current = models
+                else:
+                    current = np.subtract(models, previous, out=blended)
+                    current *= alpha
+                    current += previous
+                for piece_start, piece_end, vertex_start, vertex_count, local in pieces:
+                    piece_models = current[piece_start - start:piece_end - start]
+                    if isinstance(local, int):
+                        local = arrays["local"][local:local + len(piece_models) * vertex_count]
+                        local = local.reshape(-1, vertex_count, 3)
+                    vertex_end = vertex_start + len(piece_models) * vertex_count
+                    piece_world = world[vertex_start:vertex_end].reshape(-1, vertex_count, 3)
+                    np.matmul(local, piece_models[:, :3, :3].transpose(0, 2, 1), out=piece_world)
+                    piece_world += piece_models[:, None, :3, 3]
+            connection.send(None)
+        except Exception:
+            connection.send(traceback.format_exc())
+
+    del models, previous, world, arrays
+    for block in attached.values():
+        block.close()
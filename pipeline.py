@@ -0,0 +1,219 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from scene import Scene
+
+
+class FrameBuffer:
+    """
+    Holds everything needed to draw one projected frame of a Scene, so it can be drawn while another one is filled.
+
+    The arrays are allocated once and reused every time the FrameBuffer is filled. They are only allocated again when
+    the Scene's vertex or object count changes, or when more edges cross the Camera's near plane than ever before. The
+    Scene's strips are kept along with them, so the frame can still be drawn after the Scene is packed again.
+
+    Attributes:
+        screen_points: numpy.ndarray
+            an (N, 2) array of screen positions, as returned by Scene.project
+        visible: numpy.ndarray
+            an (N,) boolean visibility mask, as returned by Scene.project
+        bounds: numpy.ndarray
+            an (M, 4) array of every object's screen bounds, as returned by Scene.get_screen_bounds, or None if they
+            aren't kept
+        alpha: float
+            the alpha the frame was projected with
+        strips: tuple
+            the Scene's strips as of when the frame was projected, as returned by Scene.get_strips
+    """
+
+    def __init__(self):
+        """Instantiates a new, empty FrameBuffer."""
+        self.screen_points = np.empty((0, 2))
+        self.visible = np.empty(0, dtype=bool)
+        self.bounds = None
+        self.alpha = None
+        self.strips = None
+        self._clipped_edges = np.empty((0, 2, 2))
+        self._clipped_objects = np.empty(0, dtype=np.intp)
+        self._clipped_count = 0
+
+    def __repr__(self):
+        return f"FrameBuffer(vertices:{len(self.screen_points)}, clipped:{self._clipped_count})"
+
+    def fill(self, scene: Scene, screen_points: np.ndarray, visible: np.ndarray, alpha: float = None,
+             bounds: bool = False):
+        """
+        Copies a projected frame of a Scene into the FrameBuffer.
+
+        :param scene: the Scene, whose clipped edges from the last call to project are copied as well
+        :param screen_points: the (N, 2) array of screen positions returned by Scene.project
+        :param visible: the (N,) boolean visibility mask returned by Scene.project
+        :param alpha: the alpha the Scene was projected with
+        :param bounds: whether to calculate and keep every object's screen bounds
+        """
+        if self.screen_points.shape != screen_points.shape:
+            self.screen_points = np.empty_like(screen_points)
+            self.visible = np.empty_like(visible)
+        np.copyto(self.screen_points, screen_points)
+        np.copyto(self.visible, visible)
+        self.alpha = alpha
+        # packing the Scene replaces the strip arrays, so these stay as they were for as long as the frame is drawn
+        self.strips = scene.get_strips()
+
+        clipped_edges, clipped_objects = scene.get_clipped()
+        count = len(clipped_edges)
+        if count > len(self._clipped_edges):
+            # grows geometrically, so a camera slowly sweeping through the Scene doesn't allocate every frame
+            capacity = max(count, 2 * len(self._clipped_edges))
+            self._clipped_edges = np.empty((capacity, 2, 2))
+            self._clipped_objects = np.empty(capacity, dtype=np.intp)
+        self._clipped_edges[:count] = clipped_edges
+        self._clipped_objects[:count] = clipped_objects
+        self._clipped_count = count
+
+        if bounds:
+            object_bounds = scene.get_screen_bounds(screen_points, visible)
+            if self.bounds is None or self.bounds.shape != object_bounds.shape:
+                self.bounds = np.empty_like(object_bounds)
+            np.copyto(self.bounds, object_bounds)
+        else:
+            self.bounds = None
+
+    def get_clipped(self):
+        """
+        Gets the clipped edges copied into the FrameBuffer.
+
+        :return: the (K, 2, 2) clipped edges and the (K,) objects they belong to, like Scene.get_clipped
+        """
+        return self._clipped_edges[:self._clipped_count], self._clipped_objects[:self._clipped_count]
+
+
+class FramePipeline:
+    """
+    Simulates and projects the next frame of a Scene on a worker thread while the current one is drawn.
+
+    Two FrameBuffers are kept. The worker thread runs the simulation, projects the Scene, and copies the result into
+    the back buffer, while the caller draws the front buffer and flips the display. Once both are done, swap makes the
+    back buffer the new front. NumPy releases the GIL during large array operations, and so does SDL while it draws
+    and updates the display, so on a machine with more than one core the two threads mostly run at the same time. The
+    frame on screen is always one frame behind the simulation.
+
+    A frame is started with submit(update, *args), which calls update(*args) on the worker thread. The update function
+    runs the simulation steps, and returns the alpha to project the Scene with, see Scene.get_models. While a frame
+    is being filled, the worker thread owns the Scene, the Camera, and every object in the Scene, so the caller must
+    only change them from inside the update function, and must not add objects to or remove them from the Scene
+    while the FramePipeline is in use. Changes that pack the Scene again, like moving a vertex of an object that
+    shares its Mesh, are allowed in the update function: the front buffer keeps the strips it was projected with, so
+    it is still drawn correctly while the worker thread packs the Scene and projects the next frame.
+
+    Attributes:
+        scene: Scene
+            the Scene being drawn
+        camera: Camera
+            the Camera viewing the Scene
+        center_x: float
+            the horizontal center of the screen
+        center_y: float
+            the vertical center of the screen
+        simulation: ParallelSimulation
+            the ParallelSimulation whose world vertices are projected, or None to have the Scene transform them
+        bounds: bool
+            whether every frame keeps its objects' screen bounds, like for DirtyRects
+        frame_count: int
+            the number of frames swapped in so far
+    """
+
+    def __init__(self, scene: Scene, camera: Camera, center_x: float, center_y: float, simulation=None,
+                 bounds: bool = False):
+        """
+        Instantiates a new FramePipeline and starts its worker thread.
+
+        :param scene: the Scene to draw
+        :param camera: the Camera viewing the Scene
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :param simulation: an optional ParallelSimulation whose world vertices are projected
+        :param bounds: whether to keep every object's screen bounds with each frame
+        """
+        self.scene = scene
+        self.camera = camera
+        self.center_x = center_x
+        self.center_y = center_y
+        self.simulation = simulation
+        self.bounds = bounds
+        self.frame_count = 0
+        self._buffers = (FrameBuffer(), FrameBuffer())
+        self._front = 0
+        self._pending = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def __repr__(self):
+        return f"FramePipeline(objects:{len(self.scene)}, frame_count:{self.frame_count})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    @property
+    def front(self):
+        """The FrameBuffer holding the frame to draw."""
+        return self._buffers[self._front]
+
+    def submit(self, update=None, *args):
+        """
+        Starts simulating and projecting the next frame into the back buffer on the worker thread.
+
+        :param update: the function that runs the simulation steps and returns the alpha to project with, called
+            with the remaining arguments on the worker thread; the Scene is projected as it is if None
+        """
+        if self._pending is not None:
+            raise RuntimeError("the last frame submitted hasn't been swapped in yet")
+        self._pending = self._executor.submit(self._fill, self._buffers[1 - self._front], update, args)
+
+    def swap(self):
+        """
+        Waits for the frame started by submit to be filled and makes it the front buffer.
+
+        :return: the new front FrameBuffer
+        """
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            # an error on the worker thread is raised here
+            pending.result()
+            self._front = 1 - self._front
+            self.frame_count += 1
+        return self.front
+
+    def draw(self, screen: pygame.Surface, color=(255, 255, 255)):
+        """
+        Draws the front buffer's frame on the given Surface, or nothing if no frame has been swapped in yet.
+
+        :param screen: the Surface
+        :param color: the color of the edges
+        """
+        if self.frame_count == 0:
+            return
+        front = self.front
+        self.scene.draw_projected(screen, front.screen_points, front.visible, color, clipped=front.get_clipped(),
+                                  strips=front.strips)
+
+    def close(self):
+        """Waits for the frame being filled, if any, and stops the worker thread."""
+        try:
+            if self._pending is not None:
+                self._pending.result()
+        finally:
+            self._pending = None
+            self._executor.shutdown()
+
+    def _fill(self, buffer: FrameBuffer, update, args: tuple):
+        """Runs the simulation and projects the Scene into a FrameBuffer, on the worker thread."""
+        alpha = update(*args) if update is not None else None
+        world = self.simulation.get_world_vertices(alpha) if self.simulation is not None else None
+        screen_points, visible = self.scene.project(self.camera, self.center_x, self.center_y, alpha, world=world)
+        buffer.fill(self.scene, screen_points, visible, alpha, self.bounds)
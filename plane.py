@@ -1,3 +1,5 @@
+import numpy as np
+
 from line import Line
 from point import Point
 from vector import Vector, dot_product
@@ -14,6 +16,8 @@ class Plane:
             a Vector normal to the Plane
     """
 
+    __slots__ = ('point', 'normal')
+
     def __init__(self, point: Point, normal: Vector):
         """
         Instantiates a new Plane.
@@ -74,3 +78,17 @@ class Plane:
             return intersect
         else:
             return None
+
+    def has_points(self, points: np.ndarray, epsilon: float = 1e-6):
+        """
+        Determines which of many given points exist on the Plane, allowing for floating point error.
+
+        A point is on the Plane if its distance from the Plane, |n . (p - a)| / |n|, is at most epsilon.
+        :param points: an (N, 3) array of points
+        :param epsilon: the largest distance from the Plane that still counts as on it
+        :return: an (N,) boolean array that is True for the points on the Plane
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        origin = np.array([self.point.x, self.point.y, self.point.z])
+        normal = np.array([self.normal.x, self.normal.y, self.normal.z])
+        return np.abs((points - origin) @ normal) <= epsilon * np.linalg.norm(normal)
@@ -11,6 +11,8 @@ class Point:
             the Point's z position
     """
 
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x: float, y: float, z: float):
         """
         Instantiates a new Point.
@@ -56,4 +58,114 @@ class Point:
 
     def __round__(self, n):
         """Rounds the x, y, and z components of the Vector by some given amount n."""
-        return Point(round(self.x, n), round(self.y, n), round(self.z, n))
\ No newline at end of file
+        return Point(round(self.x, n), round(self.y, n), round(self.z, n))
+
+
+class BufferPoint(Point):
+    """
+    Represents a point in 3D space whose position is stored in a row of some object's vertex buffer.
+
+    A BufferPoint behaves like any other Point, but reading its x, y, or z position reads the owner's buffer directly,
+    and writing one hands the new value to the owner. This lets objects like Cube keep all of their vertices in one
+    array while still handing out Points.
+
+    Attributes:
+        owner: object
+            the object holding the vertex buffer; it must have an (N, 3) buffer attribute and a
+            set_vertex(index, axis, value) method
+        index: int
+            the row of the buffer that holds the Point's position
+    """
+
+    __slots__ = ('owner', 'index')
+
+    def __init__(self, owner, index: int):
+        """
+        Instantiates a new BufferPoint.
+
+        :param owner: the object holding the vertex buffer
+        :param index: the row of the buffer that holds the Point's position
+        """
+        self.owner = owner
+        self.index = index
+
+    @property
+    def x(self):
+        return float(self.owner.buffer[self.index, 0])
+
+    @x.setter
+    def x(self, value: float):
+        self.owner.set_vertex(self.index, 0, value)
+
+    @property
+    def y(self):
+        return float(self.owner.buffer[self.index, 1])
+
+    @y.setter
+    def y(self, value: float):
+        self.owner.set_vertex(self.index, 1, value)
+
+    @property
+    def z(self):
+        return float(self.owner.buffer[self.index, 2])
+
+    @z.setter
+    def z(self, value: float):
+        self.owner.set_vertex(self.index, 2, value)
+
+
+class ViewPoint(Point):
+    """
+    Represents a point in 3D space whose position is stored in a 3 item array owned by some other object.
+
+    Reading the ViewPoint's x, y, or z position reads the array directly, and writing one writes the array and then
+    tells the owner, so something like camera.position.x += 10 moves the owner instead of a copy.
+
+    Attributes:
+        values: numpy.ndarray
+            the 3 item array holding the Point's position
+        on_change: callable
+            called with no arguments after the position is written, or None
+    """
+
+    __slots__ = ('values', 'on_change')
+
+    def __init__(self, values, on_change=None):
+        """
+        Instantiates a new ViewPoint.
+
+        :param values: the 3 item array holding the Point's position
+        :param on_change: called with no arguments after the position is written
+        """
+        self.values = values
+        self.on_change = on_change
+
+    def _set(self, axis: int, value: float):
+        """Writes one component of the position and tells the owner."""
+        self.values[axis] = value
+        if self.on_change is not None:
+            self.on_change()
+
+    @property
+    def x(self):
+        return float(self.values[0])
+
+    @x.setter
+    def x(self, value: float):
+        self._set(0, value)
+
+    @property
+    def y(self):
+        return float(self.values[1])
+
+    @y.setter
+    def y(self, value: float):
+        self._set(1, value)
+
+    @property
+    def z(self):
+        return float(self.values[2])
+
+    @z.setter
+    def z(self, value: float):
+        self._set(2, value)
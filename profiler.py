@@ -0,0 +1,154 @@
+import csv
+import json
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+
+class FrameProfiler:
+    """
+    Records how long each stage of a frame takes over a rolling window of recent frames.
+
+    Frames are marked with begin_frame and end_frame, and the work inside a frame is timed by wrapping it in stage. Only
+    the last window_size frames are kept, so the statistics follow the current behavior of the program rather than
+    its whole history.
+
+    Attributes:
+        window_size: int
+            the number of recent frames the statistics are computed over
+        frame_times: collections.deque
+            the duration of each recent frame in seconds, from begin_frame to end_frame
+        frame_intervals: collections.deque
+            the time in seconds between the starts of each pair of recent frames, including any time spent waiting
+        stage_times: dict[str, collections.deque]
+            the duration of each stage in each recent frame in seconds
+        frame_count: int
+            the total number of frames recorded
+    """
+
+    def __init__(self, window_size: int = 240):
+        """
+        Instantiates a new FrameProfiler.
+
+        :param window_size: the number of recent frames the statistics are computed over
+        """
+        self.window_size = window_size
+        self.frame_times = deque(maxlen=window_size)
+        self.frame_intervals = deque(maxlen=window_size)
+        self.stage_times = {}
+        self.frame_count = 0
+        self._frame_start = None
+        self._last_frame_start = None
+        self._current_stages = {}
+
+    def __repr__(self):
+        return f"FrameProfiler(window_size:{self.window_size}, frame_count:{self.frame_count})"
+
+    def begin_frame(self):
+        """Marks the start of a frame."""
+        self._frame_start = perf_counter()
+        if self._last_frame_start is not None:
+            self.frame_intervals.append(self._frame_start - self._last_frame_start)
+        self._last_frame_start = self._frame_start
+        self._current_stages = {}
+
+    def end_frame(self):
+        """Marks the end of a frame and records its duration and the duration of each of its stages."""
+        if self._frame_start is None:
+            return
+        self.frame_times.append(perf_counter() - self._frame_start)
+        for name, duration in self._current_stages.items():
+            if name not in self.stage_times:
+                self.stage_times[name] = deque(maxlen=self.window_size)
+            self.stage_times[name].append(duration)
+        self.frame_count += 1
+        self._frame_start = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times the work done inside a with block as one stage of the current frame.
+
+        A stage that runs more than once in a frame has all of its runs added together.
+        :param name: the name of the stage
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._current_stages[name] = self._current_stages.get(name, 0.0) + perf_counter() - start
+
+    def get_stats(self):
+        """
+        Summarizes the recorded frames.
+
+        :return: a dict holding the frame count, the average FPS, and the mean, p50, and p99 duration in milliseconds of
+            the whole frame and of every stage
+        """
+        stats = {"frames": self.frame_count, "fps": 0.0, "frame": summarize(self.frame_times), "stages": {}}
+        if self.frame_intervals:
+            stats["fps"] = len(self.frame_intervals) / sum(self.frame_intervals)
+        for name, times in self.stage_times.items():
+            stats["stages"][name] = summarize(times)
+        return stats
+
+    def draw(self, screen: pygame.Surface, large_font: pygame.font.Font, small_font: pygame.font.Font,
+             color=(255, 255, 255)):
+        """
+        Draws the current statistics in the top left corner of the given Surface.
+
+        :param screen: the Surface
+        :param large_font: the font used for the FPS and frame time line
+        :param small_font: the font used for the per-stage lines
+        :param color: the color of the text
+        :return: the pygame.Rect covering the drawn text
+        """
+        stats = self.get_stats()
+        frame = stats["frame"]
+        lines = [(large_font, f"{stats['fps']:.0f} FPS  p50 {frame['p50']:.2f} ms  p99 {frame['p99']:.2f} ms")]
+        for name, stage in stats["stages"].items():
+            lines.append((small_font, f"{name}: p50 {stage['p50']:.2f} ms  p99 {stage['p99']:.2f} ms"))
+
+        y = 5
+        drawn = pygame.Rect(5, 5, 0, 0)
+        for font, text in lines:
+            surface = font.render(text, True, color)
+            drawn.union_ip(screen.blit(surface, (5, y)))
+            y += surface.get_height()
+        return drawn
+
+    def dump(self, path: str):
+        """
+        Writes the current statistics to a file.
+
+        The file is written as CSV if its name ends in .csv, and as JSON otherwise.
+        :param path: the path of the file
+        """
+        stats = self.get_stats()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["stage", "mean_ms", "p50_ms", "p99_ms"])
+                rows = [("frame", stats["frame"])] + list(stats["stages"].items())
+                for name, summary in rows:
+                    writer.writerow([name, summary["mean"], summary["p50"], summary["p99"]])
+        else:
+            with open(path, "w") as file:
+                json.dump(stats, file, indent=2)
+
+
+def summarize(times):
+    """
+    Calculates the mean, p50, and p99 of some given durations.
+
+    :param times: durations in seconds
+    :return: a dict holding the mean, p50, and p99 in milliseconds
+    """
+    if not times:
+        return {"mean": 0.0, "p50": 0.0, "p99": 0.0}
+    milliseconds = np.fromiter(times, dtype=np.float64) * 1000
+    p50, p99 = np.percentile(milliseconds, [50, 99])
+    return {"mean": float(milliseconds.mean()), "p50": float(p50), "p99": float(p99)}
@@ -0,0 +1,202 @@
+from functools import lru_cache
+from math import sqrt, sin, cos, acos
+
+import numpy as np
+
+from vector import Vector
+
+ROTATION_CACHE_SIZE = 1024  # the most rotations get_rotation keeps
+
+
+class Quaternion:
+    """
+    Represents a rotation in 3D space as a unit quaternion.
+
+    Multiplying two Quaternions composes their rotations, so any number of chained rotations collapse into a single
+    Quaternion that only has to be turned into a matrix once. Rotations follow the right-hand rule.
+
+    Attributes:
+        w: float
+            the Quaternion's scalar component
+        x: float
+            the Quaternion's x component
+        y: float
+            the Quaternion's y component
+        z: float
+            the Quaternion's z component
+    """
+
+    __slots__ = ('w', 'x', 'y', 'z')
+
+    def __init__(self, w: float = 1.0, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        """
+        Instantiates a new Quaternion, which is the identity rotation by default.
+
+        :param w: the Quaternion's scalar component
+        :param x: the Quaternion's x component
+        :param y: the Quaternion's y component
+        :param z: the Quaternion's z component
+        """
+        self.w = w
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __repr__(self):
+        return f"Quaternion({self.w},{self.x},{self.y},{self.z})"
+
+    def __eq__(self, other):
+        """Checks equality between two Quaternions."""
+        return self.w == other.w and self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __mul__(self, other):
+        """
+        Composes the Quaternion with some other given Quaternion.
+
+        The result rotates by the other Quaternion first and by this Quaternion second.
+        :param other: another Quaternion
+        :return: the product of the two Quaternions
+        """
+        return Quaternion(
+            self.w * other.w - self.x * other.x - self.y * other.y - self.z * other.z,
+            self.w * other.x + self.x * other.w + self.y * other.z - self.z * other.y,
+            self.w * other.y - self.x * other.z + self.y * other.w + self.z * other.x,
+            self.w * other.z + self.x * other.y - self.y * other.x + self.z * other.w,
+        )
+
+    def get_magnitude(self):
+        """Calculates and returns the magnitude of the Quaternion."""
+        return sqrt(self.w**2 + self.x**2 + self.y**2 + self.z**2)
+
+    def get_unit_quaternion(self):
+        """Calculates and returns the Quaternion scaled to a magnitude of 1, which removes built up rounding errors."""
+        magnitude = self.get_magnitude()
+        if magnitude != 0:
+            return Quaternion(self.w / magnitude, self.x / magnitude, self.y / magnitude, self.z / magnitude)
+        else:
+            return Quaternion()
+
+    def get_conjugate(self):
+        """Calculates and returns the conjugate of the Quaternion, the opposite rotation of a unit Quaternion."""
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+    def rotate(self, vector: Vector):
+        """
+        Rotates a given Vector by the Quaternion.
+
+        :param vector: the Vector
+        :return: the rotated Vector
+        """
+        # v' = v + 2w(q x v) + 2q x (q x v), where q is the Quaternion's vector part
+        tx = 2 * (self.y * vector.z - self.z * vector.y)
+        ty = 2 * (self.z * vector.x - self.x * vector.z)
+        tz = 2 * (self.x * vector.y - self.y * vector.x)
+        return Vector(
+            vector.x + self.w * tx + self.y * tz - self.z * ty,
+            vector.y + self.w * ty + self.z * tx - self.x * tz,
+            vector.z + self.w * tz + self.x * ty - self.y * tx,
+        )
+
+    def get_matrix(self, scale: float = 1.0):
+        """
+        Calculates the 3x3 rotation matrix of the Quaternion.
+
+        :param scale: an amount to uniformly scale the matrix by, so a scaled rotation can be built in one step
+        :return: a 3x3 matrix that rotates column vectors the same way as the Quaternion, multiplied by scale
+        """
+        w, x, y, z = self.w, self.x, self.y, self.z
+        s = 2 * scale
+        return np.array([
+            scale - s * (y * y + z * z), s * (x * y - w * z), s * (x * z + w * y),
+            s * (x * y + w * z), scale - s * (x * x + z * z), s * (y * z - w * x),
+            s * (x * z - w * y), s * (y * z + w * x), scale - s * (x * x + y * y),
+        ]).reshape(3, 3)
+
+
+def from_axis_angle(axis: Vector, angle: float):
+    """
+    Calculates and returns the Quaternion that rotates about a given axis by a given angle.
+
+    :param axis: the axis to rotate about, of any non-zero length
+    :param angle: the rotation in radians, counterclockwise when looking down the axis towards the origin
+    :return: a unit Quaternion
+    """
+    axis = axis.get_unit_vector()
+    s = sin(angle / 2)
+    return Quaternion(cos(angle / 2), axis.x * s, axis.y * s, axis.z * s)
+
+
+def from_matrix(matrix: np.ndarray):
+    """
+    Calculates and returns the Quaternion with the same rotation as a 3x3 rotation matrix.
+
+    :param matrix: a 3x3 rotation matrix, or a 4x4 transform matrix whose upper left 3x3 block is a rotation
+    :return: a unit Quaternion
+    """
+    m = np.asarray(matrix, dtype=np.float64)[:3, :3].tolist()
+    trace = m[0][0] + m[1][1] + m[2][2]
+    # divide by whichever component is largest, so the result stays accurate for every rotation
+    if trace > 0:
+        s = sqrt(trace + 1) * 2
+        quaternion = Quaternion(s / 4, (m[2][1] - m[1][2]) / s, (m[0][2] - m[2][0]) / s, (m[1][0] - m[0][1]) / s)
+    elif m[0][0] > m[1][1] and m[0][0] > m[2][2]:
+        s = sqrt(1 + m[0][0] - m[1][1] - m[2][2]) * 2
+        quaternion = Quaternion((m[2][1] - m[1][2]) / s, s / 4, (m[0][1] + m[1][0]) / s, (m[0][2] + m[2][0]) / s)
+    elif m[1][1] > m[2][2]:
+        s = sqrt(1 + m[1][1] - m[0][0] - m[2][2]) * 2
+        quaternion = Quaternion((m[0][2] - m[2][0]) / s, (m[0][1] + m[1][0]) / s, s / 4, (m[1][2] + m[2][1]) / s)
+    else:
+        s = sqrt(1 + m[2][2] - m[0][0] - m[1][1]) * 2
+        quaternion = Quaternion((m[1][0] - m[0][1]) / s, (m[0][2] + m[2][0]) / s, (m[1][2] + m[2][1]) / s, s / 4)
+    return quaternion.get_unit_quaternion()
+
+
+@lru_cache(maxsize=ROTATION_CACHE_SIZE)
+def get_rotation(axis: tuple, angle: float):
+    """
+    Looks up the Quaternion that rotates about a given axis by a given angle.
+
+    The Quaternions are kept in a bounded cache keyed by axis and angle that evicts the least recently used one, so
+    rotating by the same angle every frame only computes its sine and cosine once. The returned Quaternion is shared,
+    so it must not be modified.
+    :param axis: the axis to rotate about, as an (x, y, z) tuple
+    :param angle: the rotation in radians
+    :return: a unit Quaternion
+    """
+    return from_axis_angle(Vector(*axis), angle)
+
+
+def dot_product(quaternion1: Quaternion, quaternion2: Quaternion):
+    """Calculates and returns the dot product of two given Quaternions."""
+    return quaternion1.w * quaternion2.w + quaternion1.x * quaternion2.x + quaternion1.y * quaternion2.y + \
+        quaternion1.z * quaternion2.z
+
+
+def slerp(quaternion1: Quaternion, quaternion2: Quaternion, t: float):
+    """
+    Interpolates between two rotations along the shortest arc at a constant angular speed.
+
+    :param quaternion1: the unit Quaternion at t = 0
+    :param quaternion2: the unit Quaternion at t = 1
+    :param t: how far to go from the first rotation to the second, from 0 to 1
+    :return: the interpolated unit Quaternion
+    """
+    dot = dot_product(quaternion1, quaternion2)
+    # q and -q are the same rotation; flipping one of them makes the interpolation take the shorter way around
+    if dot < 0:
+        quaternion2 = Quaternion(-quaternion2.w, -quaternion2.x, -quaternion2.y, -quaternion2.z)
+        dot = -dot
+    if dot > 0.9995:
+        # the rotations are so close that a straight line between them is accurate and avoids dividing by ~0
+        weight1 = 1 - t
+        weight2 = t
+    else:
+        theta = acos(dot)
+        weight1 = sin((1 - t) * theta) / sin(theta)
+        weight2 = sin(t * theta) / sin(theta)
+    return Quaternion(
+        weight1 * quaternion1.w + weight2 * quaternion2.w,
+        weight1 * quaternion1.x + weight2 * quaternion2.x,
+        weight1 * quaternion1.y + weight2 * quaternion2.y,
+        weight1 * quaternion1.z + weight2 * quaternion2.z,
+    ).get_unit_quaternion()
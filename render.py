@@ -0,0 +1,200 @@
+"""
+Headless rendering of the rotating cube, or of the objects in a scene file, to image sequences or raw video frames.
+
+Frames are drawn to an off-screen Surface with the SDL dummy video driver, so no display is needed. They are written
+either as a numbered PNG sequence in a directory, or as raw RGB bytes on stdout that can be piped into an encoder, for
+example:
+
+    python render.py --frames 240 --output frames
+    python render.py --duration 10 --output - | ffmpeg -f rawvideo -pixel_format rgb24 -video_size 900x600 \
+        -framerate 60 -i - cube.mp4
+
+The simulation steps by exactly 1 / fps seconds per frame, so the output doesn't depend on how fast the machine is.
+"""
+import argparse
+import math
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+# pygame greets on stdout when imported, which would end up in the raw frames
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from camera import Camera
+from cube import Cube
+from impostor import ImpostorCache
+from loader import load_scene
+from main import BLACK, WHITE, SCREEN_WIDTH, SCREEN_HEIGHT, SIMULATION_RATE, ROTATE_SPEED
+from point import Point
+from profiler import FrameProfiler
+from scene import Scene
+from timestep import FixedTimestep
+
+
+class FrameWriter:
+    """
+    Writes rendered frames on a pool of background threads, so encoding and disk I/O overlap with rendering.
+
+    Each frame's pixels are copied out of the Surface when it is written, so the Surface can be drawn on again right
+    away. At most max_pending frames are waiting to be written at once; writing another one first waits for the oldest,
+    which keeps memory use bounded when the disk is slower than the renderer. Raw frames are written by a single thread,
+    so they reach stdout in order.
+
+    Attributes:
+        output: str
+            the directory PNG frames are written to, or "-" for raw RGB frames on stdout
+        threads: int
+            the number of background threads
+        max_pending: int
+            the most frames waiting to be written at once
+        frame_count: int
+            the number of frames written so far
+    """
+
+    def __init__(self, output: str, threads: int = 4, max_pending: int = 16):
+        """
+        Instantiates a new FrameWriter.
+
+        :param output: the directory to write PNG frames to, created if needed, or "-" for raw RGB frames on stdout
+        :param threads: the number of background threads used for PNG frames
+        :param max_pending: the most frames waiting to be written at once
+        """
+        self.output = output
+        self.threads = 1 if output == "-" else threads
+        self.max_pending = max_pending
+        self.frame_count = 0
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        if output != "-":
+            os.makedirs(output, exist_ok=True)
+
+    def __repr__(self):
+        return f"FrameWriter(output:{self.output}, threads:{self.threads}, frame_count:{self.frame_count})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def write(self, surface: pygame.Surface):
+        """
+        Queues a frame to be written.
+
+        :param surface: the Surface holding the frame
+        """
+        data = pygame.image.tobytes(surface, "RGB")
+        while len(self._pending) >= self.max_pending:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(self._write, data, surface.get_size(), self.frame_count))
+        self.frame_count += 1
+
+    def close(self):
+        """Waits for every queued frame to be written and stops the background threads."""
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._executor.shutdown()
+        if self.output == "-":
+            sys.stdout.buffer.flush()
+
+    def _write(self, data: bytes, size: tuple, index: int):
+        """Writes one frame's pixels, on a background thread."""
+        if self.output == "-":
+            sys.stdout.buffer.write(data)
+        else:
+            frame = pygame.image.frombuffer(data, size, "RGB")
+            pygame.image.save(frame, os.path.join(self.output, f"frame_{index:05d}.png"))
+
+
+def render(writer: FrameWriter, frames: int, fps: float, width: int, height: int, profiler: FrameProfiler = None,
+           scene: Scene = None, solid: bool = False, impostors: ImpostorCache = None):
+    """
+    Renders the rotating cube, or the objects in a Scene spinning in place, and writes every frame.
+
+    :param writer: the FrameWriter the frames are written to
+    :param frames: the number of frames to render
+    :param fps: the number of frames per second of animation
+    :param width: the width of the frames in pixels
+    :param height: the height of the frames in pixels
+    :param profiler: an optional FrameProfiler that times every frame
+    :param scene: the Scene to render; a single cube by default
+    :param solid: whether to draw filled, shaded faces instead of edges
+    :param impostors: an optional ImpostorCache that draws distant objects as sprites
+    """
+    profiler = profiler or FrameProfiler()
+    screen = pygame.Surface((width, height))
+    camera = Camera(Point(0, 0, 0), 1000)
+    if scene is None:
+        scene = Scene()
+        scene.add(Cube(Point(3000, 0, 0), 1000))
+    # every frame has to be simulated in full, no matter how many steps that takes
+    timestep = FixedTimestep(1 / SIMULATION_RATE, max_steps=math.ceil(SIMULATION_RATE / fps) + 1)
+
+    for _ in range(frames):
+        profiler.begin_frame()
+        with profiler.stage("update"):
+            for _ in range(timestep.advance(1 / fps)):
+                scene.save_state()
+                for obj in scene:
+                    obj.rotate_z(ROTATE_SPEED * timestep.step)
+        with profiler.stage("draw"):
+            screen.fill(BLACK)
+            screen_points, visible = scene.project(camera, width / 2, height / 2, timestep.alpha)
+            if solid:
+                scene.draw_faces_projected(screen, camera, screen_points, visible, WHITE)
+            elif impostors is not None:
+                drawn = impostors.draw(scene, camera, screen, screen_points, visible, timestep.alpha, WHITE)
+                scene.draw_projected(screen, screen_points, visible, WHITE, ~drawn)
+            else:
+                scene.draw_projected(screen, screen_points, visible, WHITE)
+        with profiler.stage("write"):
+            writer.write(screen)
+        profiler.end_frame()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Renders the rotating cube without a display.")
+    parser.add_argument("--scene", metavar="PATH",
+                        help="render the objects in an OBJ or binary scene file instead of the cube")
+    style = parser.add_mutually_exclusive_group()
+    style.add_argument("--solid", action="store_true", help="draw filled, shaded faces instead of edges")
+    style.add_argument("--impostors", action="store_true", help="draw distant objects as cached wireframe sprites")
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--frames", type=int, default=240, help="the number of frames to render")
+    length.add_argument("--duration", type=float, help="the number of seconds of animation to render")
+    parser.add_argument("--fps", type=float, default=60, help="the number of frames per second of animation")
+    parser.add_argument("--size", nargs=2, type=int, default=(SCREEN_WIDTH, SCREEN_HEIGHT), metavar=("WIDTH", "HEIGHT"),
+                        help="the size of the frames in pixels")
+    parser.add_argument("--output", default="frames",
+                        help="the directory to write a PNG sequence to, or - to write raw RGB frames to stdout")
+    parser.add_argument("--threads", type=int, default=4, help="the number of threads writing PNG frames")
+    parser.add_argument("--stats", metavar="PATH", help="write frame timing statistics to a .csv or .json file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    frames = args.frames if args.duration is None else round(args.duration * args.fps)
+    width, height = args.size
+    pygame.init()
+    profiler = FrameProfiler(window_size=max(frames, 1))
+    scene = load_scene(args.scene) if args.scene else None
+    with FrameWriter(args.output, args.threads) as writer:
+        render(writer, frames, args.fps, width, height, profiler, scene, args.solid,
+               ImpostorCache() if args.impostors else None)
+    stats = profiler.get_stats()
+    print(f"rendered {frames} frames of {width}x{height} at {stats['fps']:.1f} FPS", file=sys.stderr)
+    if args.stats:
+        profiler.dump(args.stats)
+    pygame.quit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
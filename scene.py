@@ -0,0 +1,761 @@
+import numpy as np
+import pygame
+
+from camera import Camera
+
+STRIP_EDGE_LIMIT = 100000  # meshes with more edges than this draw every edge as its own strip
+FACE_AMBIENT = 0.3  # the share of its color a face keeps when it is seen edge on
+
+
+def get_strips(edges: np.ndarray):
+    """
+    Splits a table of edges into strips of connected vertices.
+
+    Each strip is a list of vertex indices where every neighbouring pair is an edge, so a whole strip can be drawn with
+    a single pygame.draw.aalines call. Every edge ends up in exactly one strip. Walks start at vertices with an odd
+    number of unused edges whenever possible, since those are the vertices a strip has to end at.
+    :param edges: an (E, 2) array of vertex indices
+    :return: a list of strips, each one a list of vertex indices
+    """
+    neighbours = {}
+    for edge_index, (index0, index1) in enumerate(edges.tolist()):
+        neighbours.setdefault(index0, []).append((index1, edge_index))
+        neighbours.setdefault(index1, []).append((index0, edge_index))
+
+    used = [False] * len(edges)
+    remaining = {vertex: len(links) for vertex, links in neighbours.items()}
+    # the links before a vertex's next link are all used, so they never have to be looked at again
+    next_link = dict.fromkeys(neighbours, 0)
+    strips = []
+
+    def walk(vertex):
+        strip = [vertex]
+        while remaining[vertex] > 0:
+            links = neighbours[vertex]
+            index = next_link[vertex]
+            while used[links[index][1]]:
+                index += 1
+            next_link[vertex] = index + 1
+            neighbour, edge_index = links[index]
+            used[edge_index] = True
+            remaining[vertex] -= 1
+            remaining[neighbour] -= 1
+            vertex = neighbour
+            strip.append(vertex)
+        strips.append(strip)
+
+    # a walk from an odd vertex ends at another odd vertex, making both even, and a walk from an even vertex ends where
+    # it started, so no vertex ever becomes odd again and each list of starts only has to be passed over once
+    for vertex in [vertex for vertex, count in remaining.items() if count % 2 == 1]:
+        if remaining[vertex] % 2 == 1:
+            walk(vertex)
+    for vertex in neighbours:
+        if remaining[vertex] > 0:
+            walk(vertex)
+    return strips
+
+
+def get_strip_order(edges: np.ndarray):
+    """
+    Lays out a mesh's edges as strips, ready to be packed into a Scene.
+
+    Meshes with more than STRIP_EDGE_LIMIT edges skip get_strips, which walks the edges in Python, and use every edge as
+    a strip of its own instead, so very large meshes still pack quickly.
+    :param edges: an (E, 2) array of vertex indices
+    :return: an array of the vertex indices of every strip, one strip after another, and an array of the strips' lengths
+    """
+    if len(edges) > STRIP_EDGE_LIMIT:
+        return edges.reshape(-1), np.full(len(edges), 2, dtype=np.intp)
+    strips = get_strips(edges)
+    order = np.array([index for strip in strips for index in strip], dtype=np.intp)
+    return order, np.array([len(strip) for strip in strips], dtype=np.intp)
+
+
+def draw_strips(screen: pygame.Surface, screen_points: np.ndarray, visible: np.ndarray, order: np.ndarray,
+                starts: np.ndarray, lengths: np.ndarray, color=(255, 255, 255), strip_mask: np.ndarray = None):
+    """
+    Draws strips of projected vertices, one pygame.draw.aalines call per strip.
+
+    A strip with a vertex that cannot be projected is drawn edge by edge instead, leaving out the edges that touch that
+    vertex.
+    :param screen: the Surface
+    :param screen_points: an (N, 2) array of screen positions
+    :param visible: an (N,) boolean mask of the vertices that could be projected
+    :param order: the vertex indices of every strip, one strip after another, as returned by get_strip_order
+    :param starts: the index into order that each strip starts at
+    :param lengths: the number of vertices in each strip
+    :param color: the color of the edges
+    :param strip_mask: an optional boolean mask of the strips to draw
+    """
+    if len(order) == 0:
+        return
+    ordered_visible = visible[order]
+    whole = np.logical_and.reduceat(ordered_visible, starts)
+    partial = ~whole & np.logical_or.reduceat(ordered_visible, starts)
+    if strip_mask is not None:
+        whole &= strip_mask
+        partial &= strip_mask
+
+    # only the strips that will actually be drawn are converted to Python lists
+    selected = np.repeat(whole, lengths)
+    points = screen_points[order[selected]].tolist()
+    start = 0
+    for end in np.cumsum(lengths[whole]).tolist():
+        pygame.draw.aalines(screen, color, False, points[start:end])
+        start = end
+
+    selected = np.repeat(partial, lengths)
+    points = screen_points[order[selected]].tolist()
+    points_visible = ordered_visible[selected].tolist()
+    start = 0
+    for end in np.cumsum(lengths[partial]).tolist():
+        for index in range(start, end - 1):
+            if points_visible[index] and points_visible[index + 1]:
+                pygame.draw.aaline(screen, color, points[index], points[index + 1])
+        start = end
+
+
+def draw_faces(screen: pygame.Surface, camera: Camera, world: np.ndarray, screen_points: np.ndarray,
+               visible: np.ndarray, faces: np.ndarray, sizes: np.ndarray = None, color=(255, 255, 255)):
+    """
+    Draws filled faces from farthest to nearest, so nearer faces cover the ones behind them.
+
+    Faces turned away from the Camera are culled first, along with faces that have a vertex that could not be
+    projected, like one behind the near plane. The normals, depths, and shades of the remaining faces are computed in
+    one vectorized pass and the faces are put in order with a single argsort, so only the drawing itself is done face
+    by face. Each face is shaded by how directly it faces the Camera.
+    :param screen: the Surface
+    :param camera: the Camera viewing the faces
+    :param world: an (N, 3) array of world space vertex positions
+    :param screen_points: the (N, 2) array of the vertices' screen positions
+    :param visible: the (N,) boolean mask of the vertices that could be projected
+    :param faces: an (F, K) array of the vertex indices around each face, counterclockwise from outside; a face with
+        fewer than K vertices repeats its last vertex to fill the row
+    :param sizes: an optional (F,) array of the number of vertices around each face; K for every face by default
+    :param color: the color of a face seen head on
+    :return: the number of faces drawn
+    """
+    drawable = visible[faces].all(axis=1)
+    corners = world[faces[drawable, :3]]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    # a face is seen from the front when the ray from the Camera to it runs against its normal
+    rays = corners[:, 0] - (camera.position.x, camera.position.y, camera.position.z)
+    facing = np.einsum("ij,ij->i", normals, rays)
+    front = facing < 0
+    faces = faces[drawable][front]
+    if len(faces) == 0:
+        return 0
+
+    depths = camera.get_depths(world[faces].reshape(-1, 3)).reshape(faces.shape)
+    depth = depths.sum(axis=1)
+    if sizes is not None:
+        sizes = sizes[drawable][front]
+        # padded faces repeat their last vertex, whose extra depths are taken back out before averaging
+        depth = (depth - (faces.shape[1] - sizes) * depths[:, -1]) / sizes
+    order = np.argsort(-depth, kind="stable")
+
+    cosines = -facing[front] / (np.linalg.norm(normals[front], axis=1) * np.linalg.norm(rays[front], axis=1))
+    colors = (np.asarray(color) * (FACE_AMBIENT + (1 - FACE_AMBIENT) * cosines)[:, None]).astype(int)
+    for face_color, polygon in zip(colors[order].tolist(), screen_points[faces[order]].tolist()):
+        pygame.draw.polygon(screen, face_color, polygon)
+    return len(faces)
+
+
+def pad_faces(faces: list):
+    """
+    Stacks tables of faces with any number of vertices per face into a single table.
+
+    :param faces: a list of (F, K) arrays of vertex indices, where K may differ between arrays
+    :return: an (F, K) array of every face, where faces with fewer than K vertices repeat their last vertex, and an
+        (F,) array of the number of vertices around each face
+    """
+    if not faces:
+        return np.empty((0, 3), dtype=np.intp), np.empty(0, dtype=np.intp)
+    width = max(face_table.shape[1] for face_table in faces)
+    sizes = np.concatenate([np.full(len(face_table), face_table.shape[1], dtype=np.intp) for face_table in faces])
+    if all(face_table.shape[1] == width for face_table in faces):
+        return np.concatenate(faces), sizes
+    padded = [np.concatenate([face_table, np.repeat(face_table[:, -1:], width - face_table.shape[1], axis=1)], axis=1)
+              for face_table in faces]
+    return np.concatenate(padded), sizes
+
+
+def get_sphere(local: np.ndarray):
+    """
+    Calculates a sphere around a table of local vertices, centered on the middle of their bounding box.
+
+    :param local: a (V, 3) array of vertices, or a (K, V, 3) array of the vertices of K objects
+    :return: the center and radius, or a (K, 3) array of centers and a (K,) array of radii
+    """
+    low = local.min(axis=-2)
+    high = local.max(axis=-2)
+    center = (low + high) / 2
+    return center, np.linalg.norm(local - center[..., None, :], axis=-1).max(axis=-1)
+
+
+class Scene:
+    """
+    Represents a collection of objects that are transformed, projected, and drawn together.
+
+    Every object's model matrix and edges are packed into shared contiguous arrays. Objects that share a read-only Mesh
+    are stored next to each other and transformed with one batched matrix multiply against that Mesh's vertices, so
+    the Mesh is never copied. Objects with their own local vertices are grouped by vertex count, and their vertices are
+    packed into one more shared array. When an object is packed, its model attribute (and its local attribute, if it is
+    not shared) is replaced by a view into the Scene's arrays, so the object's own rotate and translate methods keep
+    working without the Scene having to copy anything each frame. An object that stops sharing its Mesh, like a Cube
+    after one of its vertices is moved on its own, is picked up the next time the Scene is packed.
+
+    An object can be anything with a local (V, 3) vertex array, a 4x4 model matrix, and an (E, 2) edge_indices array,
+    such as a MeshObject or a Cube. Objects with an (F, K) face_indices array can also be drawn solid. Every packed
+    object's scene attribute is set to the Scene, so it can ask to be packed again with request_pack.
+
+    The shared arrays are made by the Scene's allocate function, which can be swapped out to put them somewhere other
+    processes can reach, like the shared memory used by ParallelSimulation.
+
+    Attributes:
+        objects: list
+            the objects in the Scene, in the order they were added
+        packed_objects: list
+            the objects in the Scene, in the order they are packed into the shared arrays
+        models: numpy.ndarray
+            an (M, 4, 4) array of every object's model matrix
+        edges: numpy.ndarray
+            an (E, 2) array of every object's edges, indexing into the Scene's world vertices
+        faces: numpy.ndarray
+            an (F, K) array of every object's faces, indexing into the Scene's world vertices; faces with fewer than K
+            vertices repeat their last vertex
+        clipped_edges: numpy.ndarray
+            a (K, 2, 2) array of the screen positions of both ends of every edge that crossed the Camera's near plane
+            in the last call to project, after clipping
+        allocate: callable
+            makes an uninitialized float64 array of a given shape for the shared arrays; numpy.empty by default
+    """
+
+    def __init__(self):
+        """Instantiates a new, empty Scene."""
+        self.objects = []
+        self.packed_objects = []
+        self.models = np.empty((0, 4, 4))
+        self.edges = np.empty((0, 2), dtype=np.intp)
+        self.faces = np.empty((0, 3), dtype=np.intp)
+        self._face_sizes = np.empty(0, dtype=np.intp)
+        self._local = np.empty((0, 3))
+        self._world = np.empty((0, 3))
+        self._groups = []
+        self._previous_models = None
+        self._blended_models = None
+        self._strip_order = np.empty(0, dtype=np.intp)
+        self._strip_starts = np.empty(0, dtype=np.intp)
+        self._strip_lengths = np.empty(0, dtype=np.intp)
+        self._strip_objects = np.empty(0, dtype=np.intp)
+        self._edge_objects = np.empty(0, dtype=np.intp)
+        self._vertex_counts = np.empty(0, dtype=np.intp)
+        self.clipped_edges = np.empty((0, 2, 2))
+        self._clipped_objects = np.empty(0, dtype=np.intp)
+        self._screen_points = np.empty((0, 2))
+        self._visible = np.empty(0, dtype=bool)
+        self._projected_versions = np.empty(0, dtype=np.int64)
+        self._projected_models = np.empty((0, 4, 4))
+        self._projection_settings = None
+        self._is_packed = True
+        self.allocate = np.empty
+
+    def __repr__(self):
+        return f"Scene({len(self.objects)} objects)"
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def add(self, obj):
+        """
+        Adds an object to the Scene.
+
+        :param obj: the object
+        """
+        self.objects.append(obj)
+        self._is_packed = False
+
+    def remove(self, obj):
+        """
+        Removes an object from the Scene.
+
+        The object gets its own copies of its local vertices and model matrix back, so it can still be used on its own.
+        :param obj: the object
+        """
+        self.objects.remove(obj)
+        obj.scene = None
+        if obj.local.flags.writeable:
+            obj.local = obj.local.copy()
+        obj.model = obj.model.copy()
+        self._is_packed = False
+
+    def request_pack(self):
+        """
+        Marks the Scene to be packed again the next time it is used.
+
+        Objects call this when their layout changes in a way the shared arrays can't follow, like a MeshObject that
+        stops sharing its Mesh's vertices.
+        """
+        self._is_packed = False
+
+    def pack(self):
+        """
+        Packs every object's vertices, model matrix, and edges into the Scene's shared arrays.
+
+        This happens automatically the first time the Scene is used after objects are added or removed.
+        """
+        grouped = {}
+        topology = []
+        for obj in self.objects:
+            if obj.local.flags.writeable:
+                key = ("own", len(obj.local))
+            else:
+                # objects sharing their vertices and their edges and faces are packed in one vectorized step
+                edge_indices = obj.edge_indices
+                face_indices = getattr(obj, "face_indices", None)
+                key = ("shared", id(obj.local), id(edge_indices), id(face_indices))
+                if key not in grouped:
+                    # holding on to the arrays keeps their ids from being reused while grouping
+                    topology.append((edge_indices, face_indices))
+            grouped.setdefault(key, []).append(obj)
+
+        models = self.allocate((len(self.objects), 4, 4))
+        own_count = sum(len(obj.local) for obj in self.objects if obj.local.flags.writeable)
+        own_local = self.allocate((own_count, 3))
+        edges = []
+        edge_objects = []
+        vertex_counts = []
+        faces = []
+        strip_orders = []
+        strip_lengths = []
+        strip_objects = []
+        strip_cache = {}
+        groups = []
+        object_offset = 0
+        vertex_offset = 0
+        own_offset = 0
+
+        def add_topology(edge_indices, face_indices, count: int, vertex_count: int):
+            """Appends the edges, faces, and strips of a run of objects with the same topology."""
+            edge_indices = np.asarray(edge_indices, dtype=np.intp)
+            offsets = vertex_offset + np.arange(count, dtype=np.intp)[:, None] * vertex_count
+            object_indices = np.arange(object_offset, object_offset + count, dtype=np.intp)
+            edges.append((edge_indices[None] + offsets[:, :, None]).reshape(-1, 2))
+            edge_objects.append(np.repeat(object_indices, len(edge_indices)))
+            vertex_counts.append(np.full(count, vertex_count, dtype=np.intp))
+            if face_indices is not None and len(face_indices) > 0:
+                face_indices = np.asarray(face_indices, dtype=np.intp)
+                faces.append((face_indices[None] + offsets[:, :, None]).reshape(-1, face_indices.shape[1]))
+            key = edge_indices.tobytes()
+            if key not in strip_cache:
+                strip_cache[key] = get_strip_order(edge_indices)
+            order, lengths = strip_cache[key]
+            strip_orders.append((order[None] + offsets).reshape(-1))
+            strip_lengths.append(np.tile(lengths, count))
+            strip_objects.append(np.repeat(object_indices, len(lengths)))
+
+        for key, objects in grouped.items():
+            vertex_count = len(objects[0].local)
+            if key[0] == "shared":
+                local = objects[0].local
+            else:
+                local = own_local[own_offset:own_offset + len(objects) * vertex_count].reshape(-1, vertex_count, 3)
+                own_offset += len(objects) * vertex_count
+            groups.append((object_offset, object_offset + len(objects), vertex_offset, vertex_count, local))
+
+            group_models = models[object_offset:object_offset + len(objects)]
+            group_models[:] = [obj.model for obj in objects]
+            for index, obj in enumerate(objects):
+                obj.scene = self
+                obj.model = group_models[index]
+                if key[0] == "own":
+                    local[index] = obj.local
+                    obj.local = local[index]
+
+            if key[0] == "shared":
+                add_topology(objects[0].edge_indices, getattr(objects[0], "face_indices", None), len(objects),
+                             vertex_count)
+                object_offset += len(objects)
+                vertex_offset += len(objects) * vertex_count
+                continue
+            for obj in objects:
+                add_topology(obj.edge_indices, getattr(obj, "face_indices", None), 1, vertex_count)
+                object_offset += 1
+                vertex_offset += vertex_count
+
+        self.packed_objects = [obj for objects in grouped.values() for obj in objects]
+        self.models = models
+        self._previous_models = None
+        self._blended_models = None
+        self.edges = np.concatenate(edges) if edges else np.empty((0, 2), dtype=np.intp)
+        self._edge_objects = np.concatenate(edge_objects) if edge_objects else np.empty(0, dtype=np.intp)
+        self.faces, self._face_sizes = pad_faces(faces)
+        self._vertex_counts = np.concatenate(vertex_counts) if vertex_counts else np.empty(0, dtype=np.intp)
+        self._local = own_local
+        self._world = self.allocate((vertex_offset, 3))
+        self._groups = groups
+        self._strip_order = np.concatenate(strip_orders) if strip_orders else np.empty(0, dtype=np.intp)
+        self._strip_lengths = np.concatenate(strip_lengths) if strip_lengths else np.empty(0, dtype=np.intp)
+        self._strip_starts = np.cumsum(self._strip_lengths) - self._strip_lengths
+        self._strip_objects = np.concatenate(strip_objects) if strip_objects else np.empty(0, dtype=np.intp)
+        self.clipped_edges = np.empty((0, 2, 2))
+        self._clipped_objects = np.empty(0, dtype=np.intp)
+        self._screen_points = np.zeros((vertex_offset, 2))
+        self._visible = np.zeros(vertex_offset, dtype=bool)
+        self._projected_versions = np.full(len(self.objects), -1, dtype=np.int64)
+        self._projected_models = np.empty_like(self.models)
+        self._projection_settings = None
+        self._is_packed = True
+
+    def get_arrays(self):
+        """
+        Returns the Scene's shared arrays, packing the Scene first if needed.
+
+        :return: a dict holding the (M, 4, 4) "models" and "previous_models" arrays, the (N, 3) "world" vertex array,
+            and the "local" array of the vertices of every object that doesn't share its Mesh; "previous_models" is None
+            until save_state is first called
+        """
+        if not self._is_packed:
+            self.pack()
+        return {"models": self.models, "previous_models": self._previous_models, "world": self._world,
+                "local": self._local}
+
+    def get_groups(self, start: int, end: int):
+        """
+        Lists the parts of the Scene's groups of objects that fall within a run of packed objects.
+
+        :param start: the index of the first object in the run, in the order the Scene packs them
+        :param end: the index after the last object in the run
+        :return: a list of (start, end, vertex_start, vertex_count, local) tuples, where local is either a shared
+            (V, 3) Mesh vertex array or the (K, V, 3) part of the local array holding the objects' own vertices
+        """
+        if not self._is_packed:
+            self.pack()
+        pieces = []
+        for group_start, group_end, vertex_start, vertex_count, local in self._groups:
+            piece_start = max(start, group_start)
+            piece_end = min(end, group_end)
+            if piece_start >= piece_end:
+                continue
+            if local.ndim == 3:
+                local = local[piece_start - group_start:piece_end - group_start]
+            pieces.append((piece_start, piece_end, vertex_start + (piece_start - group_start) * vertex_count,
+                           vertex_count, local))
+        return pieces
+
+    def save_state(self):
+        """
+        Remembers every object's current model matrix as the previous simulation state.
+
+        Call this before each simulation step so get_world_vertices can interpolate between the previous and the
+        latest state.
+        """
+        if not self._is_packed:
+            self.pack()
+        if self._previous_models is None:
+            self._previous_models = self.allocate(self.models.shape)
+        self._previous_models[:] = self.models
+
+    def get_models(self, alpha: float = None):
+        """
+        Returns every object's model matrix, optionally interpolated between simulation states.
+
+        If alpha is given, the model matrices are blended between the state saved by save_state and the latest state.
+        Blending matrices linearly is only exact for translations, but is close enough for the small rotations of a
+        single simulation step.
+        :param alpha: how far to interpolate from the previous to the latest state, from 0 to 1
+        :return: an (M, 4, 4) array of model matrices; without alpha this is the Scene's own models array, which can
+            be changed directly, like with Spin
+        """
+        if not self._is_packed:
+            self.pack()
+        if alpha is None or self._previous_models is None:
+            return self.models
+        if self._blended_models is None:
+            self._blended_models = np.empty_like(self.models)
+        models = np.subtract(self.models, self._previous_models, out=self._blended_models)
+        models *= alpha
+        models += self._previous_models
+        return models
+
+    def get_world_vertices(self, alpha: float = None, object_mask: np.ndarray = None):
+        """
+        Transforms every object's local vertices into world space.
+
+        Each group of objects is transformed by one batched matrix multiply.
+        :param alpha: how far to interpolate from the previous to the latest simulation state, see get_models
+        :param object_mask: an optional (M,) boolean mask of the objects to transform, in the order the Scene packs
+            them; the world vertices of the other objects are left as they were
+        :return: an (N, 3) array of world space vertices, reused between calls
+        """
+        models = self.get_models(alpha)
+        for start, end, vertex_start, vertex_count, local in self._groups:
+            vertex_end = vertex_start + (end - start) * vertex_count
+            world = self._world[vertex_start:vertex_end].reshape(end - start, vertex_count, 3)
+            group_models = models[start:end]
+            if object_mask is None or object_mask[start:end].all():
+                np.matmul(local, group_models[:, :3, :3].transpose(0, 2, 1), out=world)
+                world += group_models[:, None, :3, 3]
+                continue
+            selected = object_mask[start:end]
+            if not selected.any():
+                continue
+            group_local = local if local.ndim == 2 else local[selected]
+            group_models = group_models[selected]
+            world[selected] = group_local @ group_models[:, :3, :3].transpose(0, 2, 1) + group_models[:, None, :3, 3]
+        return self._world
+
+    def get_bounding_spheres(self, alpha: float = None):
+        """
+        Calculates a world space sphere around every object.
+
+        Each sphere is centered on the middle of the object's local bounding box, and its radius is stretched by the
+        largest scale in the object's model matrix, so it always contains the whole object.
+        :param alpha: how far to interpolate from the previous to the latest simulation state, see get_models
+        :return: an (M, 3) array of centers and an (M,) array of radii, in the order the Scene packs the objects
+        """
+        models = self.get_models(alpha)
+        local_centers, local_radii = self.get_local_spheres()
+        rotations = models[:, :3, :3]
+        centers = np.einsum("mij,mj->mi", rotations, local_centers) + models[:, :3, 3]
+        radii = local_radii * np.linalg.norm(rotations, axis=1).max(axis=1)
+        return centers, radii
+
+    def get_local_spheres(self):
+        """
+        Calculates a local space sphere around every object's vertices, before its model matrix is applied.
+
+        Each sphere is centered on the middle of the object's local bounding box.
+        :return: an (M, 3) array of centers and an (M,) array of radii, in the order the Scene packs the objects
+        """
+        if not self._is_packed:
+            self.pack()
+        local_centers = np.empty((len(self.models), 3))
+        local_radii = np.empty(len(self.models))
+        for start, end, _, _, local in self._groups:
+            local_centers[start:end], local_radii[start:end] = get_sphere(local)
+        return local_centers, local_radii
+
+    def get_versions(self):
+        """
+        Reads every object's version counter.
+
+        :return: an (M,) array of versions in the order the Scene packs the objects, with -1 for objects that don't
+            keep a version and so have to be treated as changed every time
+        """
+        if not self._is_packed:
+            self.pack()
+        return np.fromiter((getattr(obj, "version", -1) for obj in self.packed_objects), dtype=np.int64,
+                           count=len(self.packed_objects))
+
+    def invalidate(self):
+        """
+        Forgets every object's cached screen positions, so the next call to project transforms and projects them all.
+
+        project notices changed model matrices on its own, but not local vertices changed directly through get_arrays
+        without going through the objects, so call this after changing those.
+        """
+        self._projected_versions[:] = -1
+
+    def project(self, camera: Camera, center_x: float, center_y: float, alpha: float = None, cull: bool = True,
+                index=None, world: np.ndarray = None):
+        """
+        Transforms and projects every vertex in the Scene in one vectorized pass.
+
+        Objects whose bounding spheres are entirely outside the Camera's frustum are skipped before any of their
+        vertices are transformed, and their vertices are marked as not visible. Edges with one end behind the Camera's
+        near plane are clipped to it, and are kept in clipped_edges for draw_projected.
+
+        The screen positions of every object are kept between calls, along with the object's version and model matrix,
+        and are reused for as long as neither the object's version, its model matrix, nor the Camera's version changes,
+        so only the objects that moved are transformed and projected again, even when their model matrices were
+        changed directly, like through get_models. Objects outside the Camera's frustum keep no screen positions, only
+        the version and model matrix they were culled at.
+        Objects that are between two different simulation states when alpha is given, and every object when world is
+        given, are always projected again, since their positions can change without their versions changing.
+        :param camera: the Camera viewing the Scene
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :param alpha: how far to interpolate from the previous to the latest simulation state, see get_models
+        :param cull: whether to skip objects outside the Camera's frustum
+        :param index: an optional spatial index, like a SpatialGrid, whose get_frustum_mask is used for culling instead
+            of testing every object's bounding sphere
+        :param world: the (N, 3) world space vertices, if they were already transformed somewhere else, like by
+            ParallelSimulation.get_world_vertices; culled objects are still left out of the projection
+        :return: an (N, 2) array of screen positions and an (N,) boolean visibility mask, both reused between calls
+        """
+        if not self._is_packed:
+            self.pack()
+        versions = self.get_versions()
+        settings = (camera, camera.version, center_x, center_y, cull, index)
+        if alpha is not None and self._previous_models is not None:
+            moving = (self.models != self._previous_models).any(axis=(1, 2))
+        else:
+            moving = None
+        if world is None and settings == self._projection_settings:
+            stale = (versions != self._projected_versions) | (self._projected_versions < 0)
+            # model matrices changed without going through the objects leave their versions as they were; one whole
+            # array comparison is enough for a Scene that stood still
+            if not np.array_equal(self.models, self._projected_models):
+                stale |= (self.models != self._projected_models).any(axis=(1, 2))
+            if moving is not None:
+                stale |= moving
+            if not stale.any():
+                return self._screen_points, self._visible
+        else:
+            stale = np.ones(len(self.objects), dtype=bool)
+
+        if cull and index is not None:
+            object_mask = index.get_frustum_mask(camera, center_x, center_y)
+        elif cull:
+            centers, radii = self.get_bounding_spheres(alpha)
+            object_mask = camera.spheres_in_frustum(centers, radii, center_x, center_y)
+        else:
+            object_mask = np.ones(len(self.objects), dtype=bool)
+        update = object_mask & stale
+        world_is_own = world is None
+        if world_is_own:
+            world = self.get_world_vertices(alpha, update)
+
+        vertex_update = np.repeat(update, self._vertex_counts)
+        if vertex_update.all():
+            self._screen_points[:], self._visible[:] = camera.project_points(world, center_x, center_y)
+        elif vertex_update.any():
+            self._screen_points[vertex_update], self._visible[vertex_update] = camera.project_points(
+                world[vertex_update], center_x, center_y)
+        self._visible[np.repeat(~object_mask, self._vertex_counts)] = False
+
+        # objects out of view are remembered as being out of view, but only the latest state of an object can be reused
+        self._projected_versions = np.where(stale, versions, self._projected_versions)
+        np.copyto(self._projected_models, self.models)
+        if not world_is_own:
+            self._projected_versions[:] = -1
+        elif moving is not None:
+            self._projected_versions[moving] = -1
+        self._projection_settings = settings
+
+        # an edge of a drawn object with only one visible end has its other end behind the near plane
+        edge_visible = self._visible[self.edges]
+        crossing = (edge_visible[:, 0] != edge_visible[:, 1]) & object_mask[self._edge_objects]
+        crossing_edges = self.edges[crossing]
+        points0, points1, _ = camera.clip_to_near(world[crossing_edges[:, 0]], world[crossing_edges[:, 1]])
+        self.clipped_edges = np.empty((len(crossing_edges), 2, 2))
+        self.clipped_edges[:, 0], _ = camera.project_points(points0, center_x, center_y)
+        self.clipped_edges[:, 1], _ = camera.project_points(points1, center_x, center_y)
+        self._clipped_objects = self._edge_objects[crossing]
+        return self._screen_points, self._visible
+
+    def get_clipped(self):
+        """
+        Gets the edges clipped by the near plane in the last call to project.
+
+        :return: the (K, 2, 2) clipped_edges and a (K,) array of the index of the object each edge belongs to, in the
+            order the Scene packs them
+        """
+        return self.clipped_edges, self._clipped_objects
+
+    def get_strips(self):
+        """
+        Gets the strips the Scene's edges are drawn as.
+
+        Packing the Scene replaces these arrays instead of changing them, so they can be kept to draw a frame that was
+        projected before the Scene was packed again, like FramePipeline does.
+        :return: the strips' vertex indices, start indices, lengths, and the index of the object each strip belongs to
+        """
+        return self._strip_order, self._strip_starts, self._strip_lengths, self._strip_objects
+
+    def get_screen_bounds(self, screen_points: np.ndarray, visible: np.ndarray):
+        """
+        Calculates the 2D bounding box of every object's projected vertices.
+
+        Vertices that could not be projected are left out, and the clipped edges from the last call to project are
+        included. An object with nothing to draw gets a box with infinite corners.
+        :param screen_points: the (N, 2) array of screen positions returned by project
+        :param visible: the (N,) boolean visibility mask returned by project
+        :return: an (M, 4) array of (left, top, right, bottom) boxes, one per object in the order the Scene packs them
+        """
+        if not self._is_packed:
+            self.pack()
+        bounds = np.empty((len(self.objects), 4))
+        for start, end, vertex_start, vertex_count, _ in self._groups:
+            vertex_end = vertex_start + (end - start) * vertex_count
+            points = screen_points[vertex_start:vertex_end].reshape(end - start, vertex_count, 2)
+            mask = visible[vertex_start:vertex_end].reshape(end - start, vertex_count, 1)
+            bounds[start:end, :2] = np.where(mask, points, np.inf).min(axis=1)
+            bounds[start:end, 2:] = np.where(mask, points, -np.inf).max(axis=1)
+        for end in range(2):
+            np.minimum.at(bounds[:, :2], self._clipped_objects, self.clipped_edges[:, end])
+            np.maximum.at(bounds[:, 2:], self._clipped_objects, self.clipped_edges[:, end])
+        return bounds
+
+    def draw(self, camera: Camera, screen: pygame.Surface, color=(255, 255, 255), solid: bool = False, impostors=None):
+        """
+        Draws every object in the Scene on the given Surface.
+
+        :param camera: the Camera viewing the Scene
+        :param screen: the Surface
+        :param color: the color of the edges, or of the faces seen head on
+        :param solid: whether to draw the objects' faces filled instead of their edges
+        :param impostors: an optional ImpostorCache that draws the distant objects' edges as sprites
+        """
+        screen_points, visible = self.project(camera, screen.get_width() / 2, screen.get_height() / 2)
+        if solid:
+            self.draw_faces_projected(screen, camera, screen_points, visible, color)
+        elif impostors is not None:
+            drawn = impostors.draw(self, camera, screen, screen_points, visible, color=color)
+            self.draw_projected(screen, screen_points, visible, color, ~drawn)
+        else:
+            self.draw_projected(screen, screen_points, visible, color)
+
+    def draw_faces_projected(self, screen: pygame.Surface, camera: Camera, screen_points: np.ndarray,
+                             visible: np.ndarray, color=(255, 255, 255), world: np.ndarray = None):
+        """
+        Draws every object's faces filled on the given Surface from vertices that have already been projected.
+
+        Back faces are culled and the rest are sorted from farthest to nearest across the whole Scene, see draw_faces.
+        Objects without faces aren't drawn, and neither are faces crossing the Camera's near plane.
+        :param screen: the Surface
+        :param camera: the Camera the vertices were projected with
+        :param screen_points: the (N, 2) array of screen positions returned by project
+        :param visible: the (N,) boolean visibility mask returned by project
+        :param color: the color of the faces seen head on
+        :param world: the (N, 3) world space vertices, if they were passed to project; the Scene's own by default
+        :return: the number of faces drawn
+        """
+        if not self._is_packed:
+            self.pack()
+        world = self._world if world is None else world
+        return draw_faces(screen, camera, world, screen_points, visible, self.faces, self._face_sizes, color)
+
+    def draw_projected(self, screen: pygame.Surface, screen_points: np.ndarray, visible: np.ndarray,
+                       color=(255, 255, 255), object_mask: np.ndarray = None, clipped: tuple = None,
+                       strips: tuple = None):
+        """
+        Draws every object in the Scene on the given Surface from vertices that have already been projected.
+
+        Edges are drawn as strips, one pygame.draw.aalines call per strip. A strip with a vertex that cannot be
+        projected is drawn edge by edge instead, leaving out the edges that touch that vertex. The edges clipped by
+        the near plane are drawn last.
+        :param screen: the Surface
+        :param screen_points: the (N, 2) array of screen positions returned by project
+        :param visible: the (N,) boolean visibility mask returned by project
+        :param color: the color of the edges
+        :param object_mask: an optional (M,) boolean mask of the objects to draw, in the order the Scene packs them,
+            like the objects an ImpostorCache didn't draw
+        :param clipped: the clipped edges and the objects they belong to, as returned by get_clipped, if they were kept
+            from an earlier call to project; the ones from the last call by default
+        :param strips: the strips to draw, as returned by get_strips, if they were kept from when the vertices were
+            projected; the current ones by default
+        """
+        clipped_edges, clipped_objects = self.get_clipped() if clipped is None else clipped
+        order, starts, lengths, strip_objects = self.get_strips() if strips is None else strips
+        strip_mask = None
+        if object_mask is not None:
+            strip_mask = object_mask[strip_objects]
+            clipped_edges = clipped_edges[object_mask[clipped_objects]]
+        draw_strips(screen, screen_points, visible, order, starts, lengths, color, strip_mask)
+        for point0, point1 in clipped_edges.tolist():
+            pygame.draw.aaline(screen, color, point0, point1)
@@ -0,0 +1,295 @@
+from itertools import product
+
+import numpy as np
+
+from camera import Camera
+from point import Point
+from scene import Scene, get_sphere
+from vector import Vector
+
+
+class SpatialGrid:
+    """
+    Represents a uniform grid of cubic cells over the objects of a Scene, used to speed up geometric queries.
+
+    Every object is stored in each cell its bounding sphere overlaps. Queries only look at the objects in the cells
+    they touch, so their cost grows with the number of nearby objects rather than with the size of the Scene.
+
+    The grid is kept up to date by calling update, usually once per frame. Only the objects that moved since the last
+    update, found by their versions, which translate and rotate bump, and by their model matrices, which can also be
+    changed directly, have their bounding spheres worked out again, and only the ones among them that crossed into
+    different cells are moved between cells.
+
+    Attributes:
+        scene: Scene
+            the Scene the grid indexes
+        cell_size: float
+            the length of the sides of each cell
+        cells: dict[tuple[int, int, int], set[int]]
+            the indices into scene.packed_objects of the objects overlapping each occupied cell
+        centers: numpy.ndarray
+            an (M, 3) array of the objects' bounding sphere centers as of the last update
+        radii: numpy.ndarray
+            an (M,) array of the objects' bounding sphere radii as of the last update
+    """
+
+    def __init__(self, scene: Scene, cell_size: float):
+        """
+        Instantiates a new SpatialGrid and fills it with the Scene's objects.
+
+        :param scene: the Scene to index
+        :param cell_size: the length of the sides of each cell; around the size of a typical object works well
+        """
+        self.scene = scene
+        self.cell_size = cell_size
+        self.cells = {}
+        self.centers = np.empty((0, 3))
+        self.radii = np.empty(0)
+        self._objects = None
+        self._versions = np.empty(0, dtype=np.int64)
+        self._models = np.empty((0, 4, 4))
+        self._local_centers = np.empty((0, 3))
+        self._local_radii = np.empty(0)
+        self._has_own_vertices = np.empty(0, dtype=bool)
+        self._low = np.empty((0, 3), dtype=np.int64)
+        self._high = np.empty((0, 3), dtype=np.int64)
+        self._cell_keys = []
+        self._cell_indices = np.empty((0, 3), dtype=np.int64)
+        self._cell_lows = np.empty((0, 3))
+        self.update()
+
+    def __repr__(self):
+        return f"SpatialGrid(cell_size:{self.cell_size}, objects:{len(self.centers)}, cells:{len(self.cells)})"
+
+    def update(self):
+        """
+        Moves every object that crossed into different cells since the last update.
+
+        If objects were added to or removed from the Scene, or it was packed again, the whole grid is rebuilt.
+        """
+        versions = self.scene.get_versions()
+        models = self.scene.models
+        if self._objects is not self.scene.packed_objects:
+            self._rebuild(versions)
+            return
+
+        # objects that don't keep a version are checked every time
+        changed = (versions != self._versions) | (versions < 0)
+        # the version of an object with its own vertices also changes when one of them is moved
+        for index in np.flatnonzero(changed & self._has_own_vertices).tolist():
+            self._local_centers[index], self._local_radii[index] = get_sphere(self.scene.packed_objects[index].local)
+        if not np.array_equal(models, self._models):
+            changed |= (models != self._models).any(axis=(1, 2))
+        moved = np.flatnonzero(changed)
+        self._versions = versions
+        if len(moved) == 0:
+            return
+
+        self._models[moved] = models[moved]
+        centers, radii, low, high = self._get_spheres(moved)
+        crossed = moved[(low != self._low[moved]).any(axis=1) | (high != self._high[moved]).any(axis=1)].tolist()
+        for index in crossed:
+            for cell in get_cells(self._low[index], self._high[index]):
+                members = self.cells[cell]
+                members.discard(index)
+                if not members:
+                    del self.cells[cell]
+        self.centers[moved] = centers
+        self.radii[moved] = radii
+        self._low[moved] = low
+        self._high[moved] = high
+        for index in crossed:
+            for cell in get_cells(self._low[index], self._high[index]):
+                self.cells.setdefault(cell, set()).add(index)
+        if crossed:
+            self._index_cells()
+
+    def get_frustum_mask(self, camera: Camera, center_x: float, center_y: float):
+        """
+        Determines which objects may be visible to a Camera.
+
+        Whole cells outside the Camera's frustum are rejected first, and only the objects in the remaining cells have
+        their bounding spheres tested. The result can be used in place of the culling done by Scene.project.
+        :param camera: the Camera
+        :param center_x: the horizontal center of the screen
+        :param center_y: the vertical center of the screen
+        :return: an (M,) boolean mask in the order of scene.packed_objects
+        """
+        mask = np.zeros(len(self.centers), dtype=bool)
+        if not self.cells:
+            return mask
+        planes = camera.get_frustum_planes(center_x, center_y)
+        cells = self._cell_keys
+        low = self._cell_lows
+        # the corner of each cell that is furthest along each plane's normal
+        furthest = low[:, None, :] + (planes[None, :, :3] > 0) * self.cell_size
+        inside = ((furthest * planes[None, :, :3]).sum(axis=2) + planes[:, 3] > 0).all(axis=1)
+
+        candidates = set()
+        for index in np.flatnonzero(inside).tolist():
+            candidates.update(self.cells[cells[index]])
+        if not candidates:
+            return mask
+        candidates = np.fromiter(candidates, dtype=np.intp)
+        mask[candidates] = camera.spheres_in_frustum(self.centers[candidates], self.radii[candidates], center_x,
+                                                     center_y)
+        return mask
+
+    def ray_pick(self, origin: Point, direction: Vector, max_distance: float = np.inf):
+        """
+        Finds the first object hit by a ray, such as the sight line under the mouse cursor from Camera.get_ray.
+
+        Cells are visited in the order the ray enters them, and the search stops as soon as a hit is closer than the
+        next cell. Each candidate is tested against its bounding sphere first, and then against its exact local
+        bounding box.
+        :param origin: the Point the ray starts at
+        :param direction: a unit Vector pointing along the ray
+        :param max_distance: the furthest distance along the ray to look
+        :return: the hit object and the distance to it along the ray, or None if nothing was hit
+        """
+        if not self.cells:
+            return None
+        start = np.array([origin.x, origin.y, origin.z])
+        step = np.array([direction.x, direction.y, direction.z])
+        cells = self._cell_keys
+        low = self._cell_lows
+        enter, leave = intersect_boxes(start, step, low, low + self.cell_size)
+        hit_cells = np.flatnonzero((enter <= leave) & (leave >= 0) & (enter <= max_distance))
+
+        best = None
+        best_distance = max_distance
+        tested = set()
+        for index in hit_cells[np.argsort(enter[hit_cells])].tolist():
+            if enter[index] > best_distance:
+                break
+            for object_index in self.cells[cells[index]] - tested:
+                tested.add(object_index)
+                distance = self._intersect_object(object_index, start, step)
+                if distance is not None and distance <= best_distance:
+                    best = self.scene.packed_objects[object_index]
+                    best_distance = distance
+        if best is None:
+            return None
+        return best, best_distance
+
+    def nearest(self, point: Point, max_distance: float = np.inf):
+        """
+        Finds the object whose bounding sphere center is closest to some Point.
+
+        Occupied cells are searched in rings outwards from the cell holding the Point, and the search stops once no
+        unsearched cell can hold anything closer than the best object found so far.
+        :param point: the Point
+        :param max_distance: the furthest distance to look
+        :return: the closest object and the distance to its center, or None if there is nothing within max_distance
+        """
+        if not self.cells:
+            return None
+        position = np.array([point.x, point.y, point.z])
+        home = np.floor(position / self.cell_size).astype(np.int64)
+        cells = self._cell_keys
+        rings = np.abs(self._cell_indices - home).max(axis=1)
+        order = np.argsort(rings, kind="stable")
+        sorted_rings = rings[order]
+        ring_starts = np.flatnonzero(np.diff(sorted_rings, prepend=-1)).tolist() + [len(order)]
+
+        best = None
+        best_distance = max_distance
+        for start, end in zip(ring_starts[:-1], ring_starts[1:]):
+            ring = int(sorted_rings[start])
+            # every object in this ring or further out is at least this far from the point
+            if (ring - 1) * self.cell_size >= best_distance:
+                break
+            candidates = set()
+            for index in order[start:end].tolist():
+                candidates.update(self.cells[cells[index]])
+            candidates = np.fromiter(candidates, dtype=np.intp)
+            distances = np.linalg.norm(self.centers[candidates] - position, axis=1)
+            closest = int(np.argmin(distances))
+            if distances[closest] <= best_distance:
+                best = self.scene.packed_objects[candidates[closest]]
+                best_distance = float(distances[closest])
+        if best is None:
+            return None
+        return best, best_distance
+
+    def _rebuild(self, versions: np.ndarray):
+        """Fills the grid with every object in the Scene from scratch."""
+        self._objects = self.scene.packed_objects
+        self._versions = versions
+        self._models = self.scene.models.copy()
+        self._local_centers, self._local_radii = self.scene.get_local_spheres()
+        self._has_own_vertices = np.zeros(len(versions), dtype=bool)
+        for start, end, _, _, local in self.scene.get_groups(0, len(versions)):
+            self._has_own_vertices[start:end] = local.ndim == 3
+        everything = np.arange(len(versions))
+        self.centers, self.radii, self._low, self._high = self._get_spheres(everything)
+        self.cells = {}
+        for index, low, high in zip(everything.tolist(), self._low, self._high):
+            for cell in get_cells(low, high):
+                self.cells.setdefault(cell, set()).add(index)
+        self._index_cells()
+
+    def _get_spheres(self, indices: np.ndarray):
+        """Calculates the world space spheres of some objects, and the low and high corner cells they overlap."""
+        models = self._models[indices]
+        rotations = models[:, :3, :3]
+        centers = np.einsum("mij,mj->mi", rotations, self._local_centers[indices]) + models[:, :3, 3]
+        radii = self._local_radii[indices] * np.linalg.norm(rotations, axis=1).max(axis=1)
+        low = np.floor((centers - radii[:, None]) / self.cell_size).astype(np.int64)
+        high = np.floor((centers + radii[:, None]) / self.cell_size).astype(np.int64)
+        return centers, radii, low, high
+
+    def _index_cells(self):
+        """Lays out the occupied cells as arrays for the queries, after cells were added or emptied."""
+        self._cell_keys = list(self.cells)
+        self._cell_indices = np.array(self._cell_keys, dtype=np.int64).reshape(-1, 3)
+        self._cell_lows = self._cell_indices * self.cell_size
+
+    def _intersect_object(self, object_index: int, start: np.ndarray, step: np.ndarray):
+        """Finds how far along a ray it hits one object, or None if it misses."""
+        offset = start - self.centers[object_index]
+        b = np.dot(offset, step)
+        c = np.dot(offset, offset) - self.radii[object_index] ** 2
+        if c > 0 and (b > 0 or b * b < c):
+            return None
+
+        obj = self.scene.packed_objects[object_index]
+        inverse = np.linalg.inv(obj.model)
+        local_start = inverse[:3, :3] @ start + inverse[:3, 3]
+        local_step = inverse[:3, :3] @ step
+        low = obj.local.min(axis=0)[None]
+        high = obj.local.max(axis=0)[None]
+        enter, leave = intersect_boxes(local_start, local_step, low, high)
+        if enter[0] > leave[0] or leave[0] < 0:
+            return None
+        # distances along the local ray match distances along the world ray, since the step was mapped with it
+        return max(float(enter[0]), 0.0)
+
+
+def get_cells(low, high):
+    """Lists every cell from a low corner cell to a high corner cell, inclusive."""
+    return product(*(range(int(a), int(b) + 1) for a, b in zip(low, high)))
+
+
+def intersect_boxes(start: np.ndarray, step: np.ndarray, low: np.ndarray, high: np.ndarray):
+    """
+    Intersects a ray with many axis-aligned boxes at once using the slab method.
+
+    :param start: the start of the ray
+    :param step: the direction of the ray
+    :param low: a (K, 3) array of the boxes' low corners
+    :param high: a (K, 3) array of the boxes' high corners
+    :return: (K,) arrays of how far along the ray it enters and leaves each box; it misses a box if enter > leave
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = 1.0 / step
+        t0 = (low - start) * inverse
+        t1 = (high - start) * inverse
+    # a ray parallel to a slab is inside it everywhere or nowhere
+    parallel = step == 0
+    inside = (start >= low) & (start <= high)
+    t0 = np.where(parallel, np.where(inside, -np.inf, np.inf), t0)
+    t1 = np.where(parallel, np.where(inside, np.inf, -np.inf), t1)
+    enter = np.minimum(t0, t1).max(axis=1)
+    leave = np.maximum(t0, t1).min(axis=1)
+    return enter, leave
@@ -0,0 +1,22 @@
+from benchmark import compare
+
+
+def test_compare_flags_only_slowdowns_past_the_tolerance_and_the_noise_floor():
+    baseline = [
+        {"name": "slow", "size": 1000, "seconds": 0.010},
+        {"name": "tiny", "size": 1, "seconds": 0.00001},
+        {"name": "steady", "size": 1000, "seconds": 0.010},
+    ]
+    results = [
+        {"name": "slow", "size": 1000, "seconds": 0.020},
+        {"name": "tiny", "size": 1, "seconds": 0.00004},
+        {"name": "steady", "size": 1000, "seconds": 0.011},
+        {"name": "new", "size": 1000, "seconds": 0.5},
+        {"name": "slow", "size": 10000, "seconds": 0.2},
+    ]
+    comparisons, regressions, missing = compare(results, baseline, 0.25, 0.001)
+
+    assert [(comparison["name"], comparison["regressed"]) for comparison in comparisons] == [
+        ("slow", True), ("tiny", False), ("steady", False)]
+    assert [regression["name"] for regression in regressions] == ["slow"]
+    assert missing == [("new", 1000), ("slow", 10000)]
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from camera import Camera
+from cube import Cube
+from point import Point
+from scene import Scene
+from vector import Vector
+
+
+def test_changing_a_position_component_moves_the_camera():
+    camera = Camera(Point(0, 0, 0), 50)
+    point = np.array([[100.0, 0.0, 0.0]])
+    assert np.allclose(camera.project_points(point, 50, 50)[0], [[50, 50]])
+
+    camera.position.y += 100
+    moved = Camera(Point(0, 100, 0), 50)
+    assert np.allclose(camera.project_points(point, 50, 50)[0], moved.project_points(point, 50, 50)[0])
+    assert np.allclose(camera.project_points(point, 50, 50)[0], [[0, 50]])
+
+
+def test_changing_near_rebuilds_the_frustum_and_the_projection():
+    camera = Camera(Point(0, 0, 0), 1000)
+    centers = np.array([[50.0, 0.0, 0.0]])
+    assert camera.spheres_in_frustum(centers, np.array([1.0]), 450, 300).all()
+
+    scene = Scene()
+    scene.add(Cube(Point(60, 0, 0), 4))
+    _, visible = scene.project(camera, 450, 300)
+    assert visible.all()
+
+    camera.near = 100
+    assert not camera.spheres_in_frustum(centers, np.array([1.0]), 450, 300).any()
+    _, visible = scene.project(camera, 450, 300)
+    assert not visible.any()
+
+
+def test_look_at_faces_the_target():
+    camera = Camera(Point(100, 200, 300), 1000)
+    camera.look_at(Point(100, 500, 700))
+    assert np.allclose([camera.direction.x, camera.direction.y, camera.direction.z], [0, 0.6, 0.8])
+    assert np.allclose(camera.project_points(np.array([[100.0, 500.0, 700.0]]), 450, 300)[0], [[450, 300]])
+
+
+def test_look_at_rejects_a_degenerate_target_or_up():
+    camera = Camera(Point(100, 200, 300), 1000)
+    with pytest.raises(ValueError):
+        camera.look_at(Point(100, 200, 300))
+    with pytest.raises(ValueError):
+        camera.look_at(Point(100, 200, 900), Vector(0, 0, -1))
+    with pytest.raises(ValueError):
+        camera.look_at(Point(100, 200, 900), Vector(0, 0, 0))
@@ -0,0 +1,33 @@
+import numpy as np
+
+from edge import Edge
+from point import Point
+
+
+def test_has_points_matches_has_point():
+    edge = Edge(Point(0, 0, 0), Point(4, 2, -2))
+    points = [(0, 0, 0), (4, 2, -2), (2, 1, -1), (1, 0.5, -0.5), (6, 3, -3), (-2, -1, 1), (2, 1, 0), (0, 0, 1)]
+    expected = [edge.has_point(Point(*point)) for point in points]
+    assert edge.has_points(points).tolist() == expected
+    assert expected == [True, True, True, True, False, False, False, False]
+
+
+def test_has_points_allows_for_epsilon_around_the_ends_and_the_middle():
+    edge = Edge(Point(0, 0, 0), Point(4, 2, -2))
+    along = np.array([4, 2, -2]) / np.sqrt(24)
+    # (1, -2, 0) is perpendicular to the edge
+    away = np.array([1, -2, 0]) / np.sqrt(5)
+    end = np.array([4, 2, -2])
+    points = [
+        end + along * 0.5e-3, end + along * 2e-3,
+        -along * 0.9e-3, -along * 1.1e-3,
+        end / 2 + away * 0.5e-3, end / 2 + away * 2e-3,
+    ]
+    assert edge.has_points(points, epsilon=1e-3).tolist() == [True, False, True, False, True, False]
+
+
+def test_has_points_on_a_zero_length_edge():
+    edge = Edge(Point(1, 2, 3), Point(1, 2, 3))
+    points = [(1, 2, 3), (1 + 0.5e-3, 2, 3), (1, 2 - 2e-3, 3), (1, 2, 4)]
+    assert edge.has_points(points, epsilon=1e-3).tolist() == [True, True, False, False]
+    assert [edge.has_point(Point(*point)) for point in (points[0], points[3])] == [True, False]
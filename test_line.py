@@ -0,0 +1,25 @@
+import numpy as np
+
+from line import Line
+from point import Point
+from vector import Vector
+
+
+def test_has_points_matches_has_point():
+    for direction in [Vector(2, -1, 4), Vector(0, 3, 0), Vector(1, 0, -2)]:
+        line = Line(Point(1, 2, 3), direction)
+        step = np.array([direction.x, direction.y, direction.z])
+        points = [np.array([1, 2, 3]) + t * step for t in (-3, 0, 0.5, 2)]
+        points += [points[1] + (0, 0, 1), points[2] + (1, 1, 0), (0, 0, 0)]
+        expected = [line.has_point(Point(*point)) for point in np.array(points, dtype=float).tolist()]
+        assert line.has_points(points).tolist() == expected
+        assert expected[:4] == [True] * 4
+
+
+def test_has_points_allows_for_epsilon():
+    line = Line(Point(1, 2, 3), Vector(2, -1, 4))
+    # (1, 2, 0) is perpendicular to the direction
+    away = np.array([1, 2, 0]) / np.sqrt(5)
+    on = np.array([1, 2, 3]) + 2.5 * np.array([2, -1, 4])
+    points = [on + away * 0.5e-3, on - away * 0.9e-3, on + away * 1.1e-3, on - away * 2e-3]
+    assert line.has_points(points, epsilon=1e-3).tolist() == [True, True, False, False]
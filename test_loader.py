@@ -0,0 +1,41 @@
+import numpy as np
+
+from loader import load_obj, save_obj
+from mesh import CUBE_MESH, Mesh
+
+
+def test_saving_and_loading_faces_of_mixed_sizes_keeps_the_mesh(tmp_path):
+    # a square with two triangles along its bottom and right sides
+    mesh = Mesh(
+        vertices=[(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (2, 0, 0)],
+        edges=[(0, 1), (1, 2), (2, 3), (3, 0), (1, 4), (4, 2), (0, 2)],
+        faces=[(0, 1, 2, 3), (1, 4, 2, 2), (0, 2, 3, 3)],
+    )
+    path = str(tmp_path / "mesh.obj")
+    save_obj(path, mesh)
+    loaded = load_obj(path)
+
+    assert np.array_equal(loaded.vertices, mesh.vertices)
+    assert np.array_equal(loaded.edges, np.unique(np.sort(mesh.edges, axis=1), axis=0))
+    assert np.array_equal(loaded.faces, mesh.faces)
+    with open(path) as file:
+        assert [line for line in file if line.startswith("f")] == ["f 1 2 3 4\n", "f 2 5 3\n", "f 1 3 4\n"]
+
+
+def test_saving_and_loading_a_cube_keeps_the_mesh(tmp_path):
+    path = str(tmp_path / "cube.obj")
+    save_obj(path, CUBE_MESH)
+    loaded = load_obj(path)
+
+    assert np.array_equal(loaded.vertices, CUBE_MESH.vertices)
+    assert np.array_equal(loaded.edges, np.unique(np.sort(CUBE_MESH.edges, axis=1), axis=0))
+    assert np.array_equal(loaded.faces, CUBE_MESH.faces)
+
+
+def test_loading_faces_without_lines_makes_edges_from_their_sides(tmp_path):
+    path = tmp_path / "mesh.obj"
+    path.write_text("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nv 2 0 0\nf 1 2 3 4\nf 2 5 3\n")
+    loaded = load_obj(str(path))
+
+    assert loaded.edges.tolist() == [[0, 1], [0, 3], [1, 2], [1, 4], [2, 3], [2, 4]]
+    assert loaded.faces.tolist() == [[0, 1, 2, 3], [1, 4, 2, 2]]
@@ -0,0 +1,49 @@
+import numpy as np
+
+from camera import Camera
+from cube import Cube
+from line import Line
+from point import Point
+from scene import Scene
+
+
+def test_set_vertex_after_packing_is_projected():
+    camera = Camera(Point(0, 0, 0), 1000)
+    cube = Cube(Point(3000, 0, 0), 1000)
+    other = Cube(Point(3000, 1500, 0), 1000)
+    scene = Scene()
+    scene.add(cube)
+    scene.add(other)
+    scene.project(camera, 450, 300)
+
+    cube.set_vertex(0, 2, 900)
+    screen_points, visible = scene.project(camera, 450, 300)
+
+    expected, _ = camera.project_points(cube.buffer, 450, 300)
+    start = scene.packed_objects.index(cube) * 8
+    assert visible[start:start + 8].all()
+    assert np.allclose(screen_points[start:start + 8], expected)
+    assert np.allclose(scene.get_world_vertices()[start], cube.buffer[0])
+
+
+def test_changing_a_position_component_moves_the_object():
+    camera = Camera(Point(0, 0, 0), 1000)
+    cube = Cube(Point(3000, 0, 0), 1000)
+    scene = Scene()
+    scene.add(cube)
+    scene.project(camera, 450, 300)
+
+    cube.position.x += 10
+    assert cube.position == Point(3010, 0, 0)
+    assert np.allclose(cube.buffer.mean(axis=0), (3010, 0, 0))
+    screen_points, _ = scene.project(camera, 450, 300)
+    expected, _ = camera.project_points(Cube(Point(3010, 0, 0), 1000).buffer, 450, 300)
+    assert np.allclose(screen_points, expected)
+
+
+def test_vertices_position_and_edges_keep_their_types():
+    cube = Cube(Point(3000, 0, 0), 1000)
+    assert all(isinstance(vertex, Point) for vertex in cube.vertices)
+    assert isinstance(cube.position, Point)
+    assert isinstance(Camera(Point(0, 0, 0), 1000).position, Point)
+    assert all(isinstance(edge, Line) for edge in cube.edges)
@@ -0,0 +1,24 @@
+import numpy as np
+
+from cube import Cube
+from parallel import ParallelSimulation, Spin
+from point import Point
+from scene import Scene
+from vector import Vector
+
+
+def test_rotating_after_close_continues_from_the_simulated_pose():
+    cubes = [Cube(Point(3000, 0, 0), 1000), Cube(Point(3000, 1500, 0), 500)]
+    scene = Scene()
+    for cube in cubes:
+        scene.add(cube)
+    with ParallelSimulation(scene, Spin(Vector(0, 0, 1), 1.0), 2) as simulation:
+        simulation.step(10, 0.05)
+    simulated = [cube.model.copy() for cube in cubes]
+
+    for cube, model in zip(cubes, simulated):
+        assert np.allclose(cube.model, model)
+        cube.rotate_z(0.25)
+        reference = Cube(Point(*model[:3, 3].tolist()), cube.length)
+        reference.rotate_z(0.5 + 0.25)
+        assert np.allclose(cube.buffer, reference.buffer)
@@ -0,0 +1,49 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from camera import Camera
+from cube import Cube
+from mesh import Mesh
+from mesh_object import MeshObject
+from pipeline import FramePipeline
+from point import Point
+from scene import Scene
+
+
+def draw(pipeline: FramePipeline):
+    screen = pygame.Surface((450, 300))
+    pipeline.draw(screen)
+    return pygame.image.tobytes(screen, "RGB")
+
+
+def test_drawing_a_frame_while_the_next_one_repacks_the_scene():
+    camera = Camera(Point(0, 0, 0), 500)
+    cubes = [Cube(Point(3000, -800, 0), 600), Cube(Point(3000, 800, 0), 600)]
+    triangle = Mesh([(0, 0, 0), (0, 1, 0), (0, 0, 1)], [(0, 1), (1, 2), (2, 0)])
+    scene = Scene()
+    scene.add(cubes[0])
+    scene.add(MeshObject(triangle, Point(3000, 0, 0), 500))
+    scene.add(cubes[1])
+
+    with FramePipeline(scene, camera, 225, 150) as pipeline:
+        pipeline.submit()
+        pipeline.swap()
+        before = draw(pipeline)
+
+        def stretch():
+            # the first Cube stops sharing its Mesh, which packs the Scene again with its vertices moved
+            cubes[0].set_vertex(0, 2, 900)
+        pipeline.submit(stretch)
+        # the next frame is done, but the one on screen is still the one projected before the Scene was packed again
+        pipeline._pending.result()
+        assert draw(pipeline) == before
+
+        pipeline.swap()
+        expected = FramePipeline(scene, camera, 225, 150)
+        with expected:
+            expected.submit()
+            expected.swap()
+            assert draw(pipeline) == draw(expected)
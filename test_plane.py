@@ -0,0 +1,27 @@
+import numpy as np
+
+from plane import Plane
+from point import Point
+from vector import Vector
+
+
+def test_has_points_matches_has_point():
+    for normal in [Vector(1, 2, 2), Vector(0, 0, 2)]:
+        plane = Plane(Point(1, 2, 3), normal)
+        # every point with n . p = n . (1, 2, 3) is on the Plane
+        points = [(1, 2, 3), (3, 1, 3), (-1, 3, 3), (1, 2, 4), (0, 0, 0), (5, 5, 5)]
+        if normal.x == 0:
+            points += [(7, -4, 3)]
+        else:
+            points += [(11, 0, 0), (1, 5, 0)]
+        expected = [plane.has_point(Point(*point)) for point in points]
+        assert plane.has_points(points).tolist() == expected
+        assert expected[:3] == [True] * 3
+
+
+def test_has_points_allows_for_epsilon():
+    plane = Plane(Point(1, 2, 3), Vector(1, 2, 2))
+    away = np.array([1, 2, 2]) / 3
+    on = np.array([11, 0, 0])
+    points = [on + away * 0.5e-3, on - away * 0.9e-3, on + away * 1.1e-3, on - away * 2e-3]
+    assert plane.has_points(points, epsilon=1e-3).tolist() == [True, True, False, False]
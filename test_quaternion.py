@@ -0,0 +1,52 @@
+import numpy as np
+
+from quaternion import Quaternion, from_axis_angle, from_matrix, slerp
+from vector import Vector
+
+
+def get_angle(quaternion: Quaternion):
+    """The signed angle of a rotation about the z axis."""
+    return 2 * np.arctan2(quaternion.z, quaternion.w)
+
+
+def assert_same_rotation(quaternion1: Quaternion, quaternion2: Quaternion):
+    values1 = np.array([quaternion1.w, quaternion1.x, quaternion1.y, quaternion1.z])
+    values2 = np.array([quaternion2.w, quaternion2.x, quaternion2.y, quaternion2.z])
+    # q and -q are the same rotation
+    assert np.allclose(values1, values2) or np.allclose(values1, -values2)
+
+
+def test_slerp_endpoints():
+    start = from_axis_angle(Vector(1, 2, 3), 0.4)
+    end = from_axis_angle(Vector(-2, 0, 1), 2.5)
+    assert_same_rotation(slerp(start, end, 0), start)
+    assert_same_rotation(slerp(start, end, 1), end)
+
+
+def test_slerp_moves_at_a_constant_angular_speed():
+    start = from_axis_angle(Vector(0, 0, 1), 0.2)
+    end = from_axis_angle(Vector(0, 0, 1), 1.8)
+    angles = [get_angle(slerp(start, end, t)) for t in np.linspace(0, 1, 9)]
+    assert np.allclose(angles, np.linspace(0.2, 1.8, 9))
+
+
+def test_slerp_takes_the_shortest_path():
+    start = Quaternion()
+    # turning 3/2 of a half turn one way is the same as half of a half turn the other way
+    end = from_axis_angle(Vector(0, 0, 1), 1.5 * np.pi)
+    assert np.isclose(get_angle(slerp(start, end, 0.5)), -np.pi / 4)
+    flipped = Quaternion(-end.w, -end.x, -end.y, -end.z)
+    assert_same_rotation(slerp(start, flipped, 0.5), slerp(start, end, 0.5))
+
+
+def test_from_matrix_round_trip():
+    rng = np.random.default_rng(0)
+    quaternions = [Quaternion(*values / np.linalg.norm(values)) for values in rng.normal(size=(200, 4)).tolist()]
+    # half turns about each axis have a trace of -1 and take the other branches
+    quaternions += [Quaternion(0, 1, 0, 0), Quaternion(0, 0, 1, 0), Quaternion(0, 0, 0, 1), Quaternion()]
+    for quaternion in quaternions:
+        assert_same_rotation(from_matrix(quaternion.get_matrix()), quaternion)
+        model = np.identity(4)
+        model[:3, :3] = quaternion.get_matrix()
+        model[:3, 3] = (5, -6, 7)
+        assert_same_rotation(from_matrix(model), quaternion)
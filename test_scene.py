@@ -0,0 +1,39 @@
+import numpy as np
+
+from camera import Camera
+from cube import Cube
+from parallel import Spin
+from point import Point
+from scene import Scene
+from vector import Vector
+
+
+def test_project_after_changing_the_models_directly():
+    camera = Camera(Point(0, 0, 0), 1000)
+    scene = Scene()
+    scene.add(Cube(Point(3000, 0, 0), 1000))
+    scene.add(Cube(Point(3000, 1500, 0), 500))
+    before = scene.project(camera, 450, 300)[0].copy()
+
+    Spin(Vector(0, 0, 1), 1.0)(scene.get_models(), 0.25)
+    screen_points, _ = scene.project(camera, 450, 300)
+
+    expected, _ = camera.project_points(scene.get_world_vertices(), 450, 300)
+    assert not np.allclose(screen_points, before)
+    assert np.allclose(screen_points, expected)
+
+
+def test_project_after_invalidating_local_vertices_changed_directly():
+    camera = Camera(Point(0, 0, 0), 1000)
+    cube = Cube(Point(3000, 0, 0), 1000)
+    cube.set_vertex(0, 2, 900)
+    scene = Scene()
+    scene.add(cube)
+    scene.project(camera, 450, 300)
+
+    scene.get_arrays()["local"][0] *= 0.5
+    scene.invalidate()
+    screen_points, _ = scene.project(camera, 450, 300)
+
+    expected, _ = camera.project_points(scene.get_world_vertices(), 450, 300)
+    assert np.allclose(screen_points, expected)
@@ -0,0 +1,99 @@
+import numpy as np
+
+from camera import Camera
+from cube import Cube
+from parallel import Spin
+from point import Point
+from scene import Scene
+from spatial import SpatialGrid, get_cells
+from vector import Vector
+
+
+def make_scene(count: int):
+    rng = np.random.default_rng(1)
+    scene = Scene()
+    for position, length in zip(rng.uniform(-6000, 6000, (count, 3)).tolist(), rng.uniform(50, 800, count).tolist()):
+        scene.add(Cube(Point(*position), length))
+    scene.pack()
+    return scene
+
+
+def get_brute_force_cells(scene: Scene, cell_size: float):
+    cells = {}
+    centers, radii = scene.get_bounding_spheres()
+    low = np.floor((centers - radii[:, None]) / cell_size).astype(np.int64)
+    high = np.floor((centers + radii[:, None]) / cell_size).astype(np.int64)
+    for index in range(len(centers)):
+        for cell in get_cells(low[index], high[index]):
+            cells.setdefault(cell, set()).add(index)
+    return cells
+
+
+def check_queries(scene: Scene, grid: SpatialGrid, camera: Camera):
+    centers, radii = scene.get_bounding_spheres()
+    assert np.allclose(grid.centers, centers)
+    assert np.allclose(grid.radii, radii)
+    assert grid.cells == get_brute_force_cells(scene, grid.cell_size)
+    assert np.array_equal(grid.get_frustum_mask(camera, 450, 300), camera.spheres_in_frustum(centers, radii, 450, 300))
+
+    rng = np.random.default_rng(2)
+    for screen_x, screen_y in rng.uniform((0, 0), (900, 600), (20, 2)).tolist():
+        origin, direction = camera.get_ray(screen_x, screen_y, 450, 300)
+        start = np.array([origin.x, origin.y, origin.z])
+        step = np.array([direction.x, direction.y, direction.z])
+        hits = [(grid._intersect_object(index, start, step), index) for index in range(len(scene))]
+        hits = [(distance, index) for distance, index in hits if distance is not None]
+        picked = grid.ray_pick(origin, direction)
+        if not hits:
+            assert picked is None
+        else:
+            distance, _ = min(hits)
+            assert picked is not None and np.isclose(picked[1], distance)
+
+    for point in rng.uniform(-7000, 7000, (20, 3)).tolist():
+        distances = np.linalg.norm(centers - point, axis=1)
+        obj, distance = grid.nearest(Point(*point))
+        assert np.isclose(distance, distances.min())
+        assert obj is scene.packed_objects[int(np.argmin(distances))]
+
+
+def test_queries_match_brute_force_as_objects_move():
+    scene = make_scene(200)
+    camera = Camera(Point(-7000, 0, 0), 1000)
+    grid = SpatialGrid(scene, 1000)
+    check_queries(scene, grid, camera)
+
+    for obj in scene.packed_objects[::3]:
+        obj.translate(900, -400, 250)
+    for obj in scene.packed_objects[1::5]:
+        obj.rotate_z(0.7)
+    stretched = scene.packed_objects[2]
+    stretched.set_vertex(0, 0, stretched.buffer[0, 0] + 3000)
+    grid.update()
+    check_queries(scene, grid, camera)
+
+    # the second time the object already has its own vertices, so the Scene isn't packed again
+    stretched.set_vertex(1, 1, stretched.buffer[1, 1] - 3000)
+    grid.update()
+    check_queries(scene, grid, camera)
+
+    Spin(Vector(1, 0, 0), 1.0)(scene.get_models(), 0.5)
+    scene.get_models()[::7, :3, 3] += 1500
+    grid.update()
+    check_queries(scene, grid, camera)
+
+
+def test_update_only_recomputes_the_moved_objects():
+    scene = make_scene(50)
+    grid = SpatialGrid(scene, 1000)
+    recomputed = []
+    get_spheres = grid._get_spheres
+    grid._get_spheres = lambda indices: recomputed.append(indices.tolist()) or get_spheres(indices)
+
+    grid.update()
+    scene.packed_objects[4].translate(5000, 0, 0)
+    scene.get_models()[9, :3, 3] += 5000
+    grid.update()
+
+    assert recomputed == [[4, 9]]
+    assert grid.cells == get_brute_force_cells(scene, grid.cell_size)
@@ -0,0 +1,53 @@
+class FixedTimestep:
+    """
+    Decides how many fixed-size simulation steps to run for the time that has passed since the last frame.
+
+    Real time is added to an accumulator every frame, and whole steps are taken out of it. Whatever is left over is
+    less than one step, and alpha tells the renderer how far the current moment is between the last two simulation
+    states, so it can interpolate between them. This keeps motion the same no matter how fast frames are drawn.
+
+    Attributes:
+        step: float
+            the length of one simulation step in seconds
+        max_steps: int
+            the most steps to run in one frame, so a slow frame can't cause an ever growing backlog
+        accumulator: float
+            the time in seconds that has passed but hasn't been simulated yet
+    """
+
+    def __init__(self, step: float, max_steps: int = 5):
+        """
+        Instantiates a new FixedTimestep.
+
+        :param step: the length of one simulation step in seconds
+        :param max_steps: the most steps to run in one frame
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def __repr__(self):
+        return f"FixedTimestep(step:{self.step}, max_steps:{self.max_steps}, accumulator:{self.accumulator})"
+
+    def advance(self, elapsed: float):
+        """
+        Adds the time that has passed since the last frame and returns how many steps to simulate.
+
+        If more than max_steps worth of time is waiting, the extra time is dropped and the simulation slows down
+        instead of falling further and further behind.
+        :param elapsed: the time in seconds since the last frame
+        :return: the number of steps to simulate
+        """
+        self.accumulator += elapsed
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the current moment is between the previous and the latest simulation state, from 0 to 1."""
+        return min(self.accumulator / self.step, 1.0)
@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def transform_points(matrix: np.ndarray, points: np.ndarray, out: np.ndarray = None):
+    """
+    Applies a homogeneous transform to every row of an (N, 3) array of points.
+
+    The points are never expanded to homogeneous coordinates; the rotation part of the matrix is applied with a single
+    matrix multiply and the translation part is added afterwards.
+    :param matrix: a 4x4 transform matrix
+    :param points: an (N, 3) array of points
+    :param out: an optional (N, 3) array the transformed points are written into
+    :return: the (N, 3) array of transformed points
+    """
+    out = np.matmul(points, matrix[:3, :3].T, out=out)
+    out += matrix[:3, 3]
+    return out
+
@@ -14,6 +14,8 @@ class Vector:
             the Vector's z component
     """
 
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x: float, y: float, z: float):
         """
         Instantiates a new Vector.